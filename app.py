@@ -8,6 +8,7 @@ sys.path.append(os.path.join(os.getcwd(), "src"))
 
 from src.rag import ingest_docs
 from src.agents import create_graph
+from src.guards import redact_competitors
 from src.langfuse_integration import get_langfuse_client, is_langfuse_enabled
 
 st.set_page_config(page_title="AI Campaign Orchestrator", layout="wide", initial_sidebar_state="expanded")
@@ -66,9 +67,81 @@ ALL_CHANNELS = [
 
 # ─── Session State ────────────────────────────────────────────────────────────
 
+@st.cache_resource
+def get_graph():
+    """
+    Compiled workflow shared by every session and rerun.
+    Campaign state is isolated per thread_id by the checkpointer, so starting a
+    new campaign only needs a fresh thread_id, not a rebuilt graph.
+    """
+    return create_graph()
+
+
+def new_thread_config() -> dict:
+    return {"configurable": {"thread_id": str(uuid.uuid4())}}
+
+
+def start_new_thread() -> None:
+    """
+    Moves the session onto a fresh thread, deleting the abandoned one's checkpoints
+    first — the cached graph is shared by every session, so they would otherwise
+    accumulate for the life of the server.
+    """
+    get_graph().checkpointer.delete_thread(st.session_state.config["configurable"]["thread_id"])
+    st.session_state.config = new_thread_config()
+
+
+NODE_LABELS = {
+    "context_prefetch":     "🗂️ Prefetched knowledge-base context for every asset",
+    "retriever":            "📚 Retrieved knowledge-base context",
+    "query_rewriter":       "✏️ Rewrote search query",
+    "compliance_checker":   "🛡️ Ran compliance check",
+    "grader":               "🧭 Graded retrieval relevance and draft grounding",
+    "variant_writer":       "👥 Wrote audience variants",
+    "feedback_processor":   "💬 Applied your feedback",
+    "reviewer":             "📋 Completed brand compliance review",
+    "publisher":            "🚀 Published drafts",
+}
+
+
+def run_graph(graph_input, label: str):
+    """
+    Runs the graph to its next interrupt, streaming node updates into a status panel
+    so each step — and each finished draft — appears as soon as it completes.
+    Writer tokens stream into a live preview while the draft is being generated.
+    """
+    with st.status(label, expanded=True) as status:
+        live, streamed = None, ""
+        for mode, payload in st.session_state.graph.stream(
+            graph_input, config=st.session_state.config, stream_mode=["updates", "messages"]
+        ):
+            if mode == "messages":
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == "writer" and isinstance(chunk.content, str):
+                    if live is None:
+                        live = st.empty()
+                    streamed += chunk.content
+                    live.caption(redact_competitors(streamed)[-300:])
+                continue
+            for node, values in payload.items():
+                if node.startswith("__"):
+                    continue  # interrupt markers
+                values = values or {}
+                asset = values.get("current_asset")
+                if node == "writer" and asset in (values.get("drafts") or {}):
+                    if live is not None:
+                        live.empty()  # replaced by the final, guardrail-checked draft
+                        live, streamed = None, ""
+                    st.markdown(f"✍️ Drafted **{asset}**")
+                    st.caption(values["drafts"][asset][:300] + "…")
+                elif node in NODE_LABELS:
+                    st.write(NODE_LABELS[node])
+        status.update(label=f"{label} — done", state="complete", expanded=False)
+
+
 if "graph" not in st.session_state:
-    st.session_state.graph = create_graph()
-    st.session_state.config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    st.session_state.graph = get_graph()
+    st.session_state.config = new_thread_config()
 
 if "run_stage" not in st.session_state:
     st.session_state.run_stage = "entry"
@@ -498,6 +571,67 @@ def show_draft_with_variants(asset: str, primary_content: str, variant_content:
             st.info("Variant draft not yet generated for this asset.")
 
 
+@st.fragment
+def draft_review_panel(asset_name: str, content: str, variant_content: str,
+                       score: float | None, flags: list, c_summary: str):
+    """
+    One draft's review panel. Runs as a fragment so editing revision notes reruns
+    only this panel; Approve / Revise still trigger a full rerun to refresh the summary.
+    """
+    badge = f"  ·  {_confidence_badge(score)} Confidence ({score*100:.0f}%)" if score is not None else ""
+    current_status = st.session_state.draft_statuses.get(asset_name, "pending")
+    compliance_icon = {"PASS": "✅", "WARN": "⚠️", "BLOCK": "🚫"}.get(c_summary, "✅")
+
+    status_color = {"approved": "✅", "needs_revision": "🔄", "pending": "⏳"}
+    header = (
+        f"📄 {asset_name}{badge}   "
+        f"{status_color.get(current_status, '⏳')} {current_status.replace('_', ' ').title()}   "
+        f"{compliance_icon} {c_summary}"
+    )
+
+    with st.expander(header, expanded=(current_status == "pending")):
+        # Tabbed content preview
+        show_draft_with_variants(asset_name, content, variant_content)
+        st.divider()
+        # Compact compliance summary
+        if flags:
+            high_count = sum(1 for f in flags if f["severity"] == "HIGH")
+            med_count = sum(1 for f in flags if f["severity"] == "MEDIUM")
+            st.caption(f"Compliance: {high_count} HIGH · {med_count} MEDIUM flag(s)")
+        st.divider()
+
+        # Action row
+        a_col, b_col, c_col = st.columns([3, 1, 1])
+
+        with a_col:
+            st.session_state.draft_feedback[asset_name] = st.text_area(
+                "Revision notes",
+                value=st.session_state.draft_feedback.get(asset_name, ""),
+                placeholder="Describe changes (e.g., 'More formal tone', 'Add 2025 stats', 'Shorten to 150 words')",
+                height=80,
+                key=f"fb_{asset_name}",
+                label_visibility="collapsed",
+            )
+
+        with b_col:
+            st.markdown("&nbsp;")
+            if st.button("✅ Approve", key=f"app_{asset_name}", use_container_width=True):
+                st.session_state.draft_statuses[asset_name] = "approved"
+                log_audit("Draft Review", f"Approved: {asset_name}")
+                st.rerun()
+
+        with c_col:
+            st.markdown("&nbsp;")
+            if st.button("🔄 Revise", key=f"rev_{asset_name}", use_container_width=True):
+                fb = st.session_state.draft_feedback.get(asset_name, "").strip()
+                if fb:
+                    st.session_state.draft_statuses[asset_name] = "needs_revision"
+                    log_audit("Draft Review", f"Revision requested: {asset_name}", fb)
+                    st.rerun()
+                else:
+                    st.error("Add revision notes before requesting a revision.")
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 # STAGE: entry — Goal Builder
 # ═════════════════════════════════════════════════════════════════════════════
@@ -648,7 +782,13 @@ if st.session_state.run_stage == "entry":
     st.divider()
     can_launch = bool(final_goal and final_goal.strip())
 
-    launch_col, _ = st.columns([2, 3])
+    launch_col, mode_col = st.columns([2, 3])
+    with mode_col:
+        fast_mode = st.toggle(
+            "⚡ Fast mode",
+            help="Plan, draft and review the whole campaign in one AI call. Skips plan approval "
+                 "and per-draft review; brand compliance review and publish authorization still apply.",
+        )
     with launch_col:
         if st.button("🚀 Start Campaign", type="primary", disabled=not can_launch, use_container_width=True):
             _active_provider = os.environ.get("LLM_PROVIDER", "gemini").lower()
@@ -673,12 +813,21 @@ if st.session_state.run_stage == "entry":
                         except Exception as e:
                             st.warning(f"Langfuse trace failed: {e}")
 
-                    initial_input = {"goal": final_goal, "confidence_scores": {}}
+                    initial_input = {
+                        "goal": final_goal,
+                        "confidence_scores": {},
+                        "mode": "fast" if fast_mode else "detailed",
+                    }
                     if st.session_state.langfuse_trace_id:
                         initial_input["langfuse_trace_id"] = st.session_state.langfuse_trace_id
 
                     st.session_state.graph.invoke(initial_input, config=st.session_state.config)
-                    st.session_state.run_stage = "plan_approval"
+                    # Fast mode pauses at the brand review gate instead of after the planner
+                    next_nodes = st.session_state.graph.get_state(st.session_state.config).next
+                    if "brand_review_gate" in next_nodes:
+                        st.session_state.run_stage = "compliance_review"
+                    else:
+                        st.session_state.run_stage = "plan_approval"
                     st.rerun()
 
     if not can_launch:
@@ -705,16 +854,14 @@ elif st.session_state.run_stage == "plan_approval":
         if st.button("✅ Approve Plan & Start Drafting", type="primary", use_container_width=True):
             log_audit("Plan Approval", "Approved strategic plan",
                       f"{len(current_values.get('plan', []))} assets approved")
-            with st.spinner("Drafting all assets — this may take a minute..."):
-                st.session_state.graph.invoke(None, config=st.session_state.config)
-                st.session_state.run_stage = "draft_approval"
-                st.rerun()
+            run_graph(None, "Drafting all assets — this may take a minute...")
+            st.session_state.run_stage = "draft_approval"
+            st.rerun()
     with col_reset:
         if st.button("↩️ Redefine Goal", use_container_width=True):
             st.session_state.run_stage = "entry"
             st.session_state.compliance_acknowledged = {}
-            st.session_state.graph = create_graph()
-            st.session_state.config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            start_new_thread()
             st.rerun()
 
 
@@ -823,62 +970,15 @@ elif st.session_state.run_stage == "feedback_collection":
     compliance_summary = current_values.get("compliance_summary") or {}
 
     for asset_name, content in drafts.items():
-        score = confidence_scores.get(asset_name)
-        badge = f"  ·  {_confidence_badge(score)} Confidence ({score*100:.0f}%)" if score is not None else ""
-        current_status = st.session_state.draft_statuses.get(asset_name, "pending")
-        c_summary = compliance_summary.get(asset_name, "PASS")
-        compliance_icon = {"PASS": "✅", "WARN": "⚠️", "BLOCK": "🚫"}.get(c_summary, "✅")
-
-        status_color = {"approved": "✅", "needs_revision": "🔄", "pending": "⏳"}
-        header = (
-            f"📄 {asset_name}{badge}   "
-            f"{status_color.get(current_status, '⏳')} {current_status.replace('_', ' ').title()}   "
-            f"{compliance_icon} {c_summary}"
+        draft_review_panel(
+            asset_name,
+            content,
+            draft_variants.get(asset_name, ""),
+            confidence_scores.get(asset_name),
+            compliance_flags.get(asset_name, []),
+            compliance_summary.get(asset_name, "PASS"),
         )
 
-        with st.expander(header, expanded=(current_status == "pending")):
-            # Tabbed content preview
-            show_draft_with_variants(asset_name, content, draft_variants.get(asset_name, ""))
-            st.divider()
-            # Compact compliance summary
-            flags = compliance_flags.get(asset_name, [])
-            if flags:
-                high_count = sum(1 for f in flags if f["severity"] == "HIGH")
-                med_count = sum(1 for f in flags if f["severity"] == "MEDIUM")
-                st.caption(f"Compliance: {high_count} HIGH · {med_count} MEDIUM flag(s)")
-            st.divider()
-
-            # Action row
-            a_col, b_col, c_col = st.columns([3, 1, 1])
-
-            with a_col:
-                st.session_state.draft_feedback[asset_name] = st.text_area(
-                    "Revision notes",
-                    value=st.session_state.draft_feedback.get(asset_name, ""),
-                    placeholder="Describe changes (e.g., 'More formal tone', 'Add 2025 stats', 'Shorten to 150 words')",
-                    height=80,
-                    key=f"fb_{asset_name}",
-                    label_visibility="collapsed",
-                )
-
-            with b_col:
-                st.markdown("&nbsp;")
-                if st.button("✅ Approve", key=f"app_{asset_name}", use_container_width=True):
-                    st.session_state.draft_statuses[asset_name] = "approved"
-                    log_audit("Draft Review", f"Approved: {asset_name}")
-                    st.rerun()
-
-            with c_col:
-                st.markdown("&nbsp;")
-                if st.button("🔄 Revise", key=f"rev_{asset_name}", use_container_width=True):
-                    fb = st.session_state.draft_feedback.get(asset_name, "").strip()
-                    if fb:
-                        st.session_state.draft_statuses[asset_name] = "needs_revision"
-                        log_audit("Draft Review", f"Revision requested: {asset_name}", fb)
-                        st.rerun()
-                    else:
-                        st.error("Add revision notes before requesting a revision.")
-
     st.divider()
 
     # Bulk action + status summary
@@ -914,23 +1014,22 @@ elif st.session_state.run_stage == "feedback_collection":
                     st.session_state.draft_statuses.get(a) == "needs_revision"
                     for a in drafts
                 )
-                with st.spinner("Processing feedback..." if needs_revision else "Running brand compliance review..."):
-                    st.session_state.graph.update_state(
-                        st.session_state.config,
-                        {
-                            "user_feedback": st.session_state.draft_feedback,
-                            "draft_status": st.session_state.draft_statuses,
-                        },
-                    )
-                    st.session_state.graph.invoke(None, config=st.session_state.config)
+                st.session_state.graph.update_state(
+                    st.session_state.config,
+                    {
+                        "user_feedback": st.session_state.draft_feedback,
+                        "draft_status": st.session_state.draft_statuses,
+                    },
+                )
+                run_graph(None, "Processing feedback..." if needs_revision else "Running brand compliance review...")
 
-                    if needs_revision:
-                        st.session_state.draft_feedback = {}
-                        st.session_state.draft_statuses = {}
-                        st.session_state.run_stage = "feedback_collection"
-                    else:
-                        st.session_state.run_stage = "compliance_review"
-                    st.rerun()
+                if needs_revision:
+                    st.session_state.draft_feedback = {}
+                    st.session_state.draft_statuses = {}
+                    st.session_state.run_stage = "feedback_collection"
+                else:
+                    st.session_state.run_stage = "compliance_review"
+                st.rerun()
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -950,6 +1049,8 @@ elif st.session_state.run_stage == "compliance_review":
     draft_variants = current_values.get("draft_variants") or {}
     critique = current_values.get("critique", "")
     confidence_scores = current_values.get("confidence_scores") or {}
+    compliance_flags = current_values.get("compliance_flags") or {}
+    compliance_summary = current_values.get("compliance_summary") or {}
 
     # ── Brand Compliance Critique ─────────────────────────────────────────────
     if critique:
@@ -970,6 +1071,10 @@ elif st.session_state.run_stage == "compliance_review":
         with st.expander(f"📄 {asset}{badge}", expanded=True):
             show_draft_with_variants(asset, content, draft_variants.get(asset, ""))
             st.divider()
+            # Same HIGH-flag acknowledgement gate as draft review — fast mode reaches
+            # this stage directly, and revisions may introduce new flags
+            show_compliance_gate(asset, compliance_flags.get(asset, []), compliance_summary.get(asset, "PASS"))
+            st.divider()
 
             d_col, fb_col = st.columns([1, 2])
             with d_col:
@@ -1000,6 +1105,14 @@ elif st.session_state.run_stage == "compliance_review":
 
     any_revisions = any(s == "needs_revision" for s in revision_statuses.values())
     revision_count = sum(1 for s in revision_statuses.values() if s == "needs_revision")
+    all_cleared = all(
+        compliance_summary.get(asset, "PASS") != "BLOCK"
+        or st.session_state.compliance_acknowledged.get(asset, False)
+        for asset in drafts
+    )
+    if not all_cleared:
+        st.error("🚫 One or more drafts have unacknowledged HIGH compliance flags. "
+                 "Acknowledge them above or send those drafts for revision.")
 
     col_accept, col_revise = st.columns([2, 1])
 
@@ -1008,7 +1121,7 @@ elif st.session_state.run_stage == "compliance_review":
             "✅ Accept Review & Proceed to Publish Authorization",
             type="primary",
             use_container_width=True,
-            disabled=any_revisions,
+            disabled=any_revisions or not all_cleared,
         ):
             log_audit("Compliance Review", "Accepted brand compliance review",
                       f"{len(drafts)} drafts accepted")
@@ -1040,15 +1153,14 @@ elif st.session_state.run_stage == "compliance_review":
                     "draft_status": revision_statuses,
                 },
             )
-            with st.spinner(f"Regenerating {revision_count} draft(s) and re-running brand review..."):
-                # invoke 1: brand_review_gate routes to feedback_processor → PAUSE before feedback_processor
-                st.session_state.graph.invoke(None, config=st.session_state.config)
-                # invoke 2: feedback_processor → writing loop → reviewer → PAUSE before brand_review_gate
-                st.session_state.graph.invoke(None, config=st.session_state.config)
-                st.session_state.draft_feedback = {}
-                st.session_state.draft_statuses = {}
-                st.session_state.run_stage = "compliance_review"
-                st.rerun()
+            # run 1: brand_review_gate routes to feedback_processor → PAUSE before feedback_processor
+            run_graph(None, "Routing revision request...")
+            # run 2: feedback_processor → writing loop → reviewer → PAUSE before brand_review_gate
+            run_graph(None, f"Regenerating {revision_count} draft(s) and re-running brand review...")
+            st.session_state.draft_feedback = {}
+            st.session_state.draft_statuses = {}
+            st.session_state.run_stage = "compliance_review"
+            st.rerun()
 
     if any_revisions:
         st.info("Mark all drafts as ✅ Accept to enable the proceed button.")
@@ -1088,10 +1200,9 @@ elif st.session_state.run_stage == "review_approval":
                 "Authorized final publish to Google Workspace",
                 f"{len(current_values.get('drafts', {}))} assets",
             )
-            with st.spinner("Publishing to Google Docs & scheduling in Calendar..."):
-                st.session_state.graph.invoke(None, config=st.session_state.config)
-                st.session_state.run_stage = "complete"
-                st.rerun()
+            run_graph(None, "Publishing to Google Docs & scheduling in Calendar...")
+            st.session_state.run_stage = "complete"
+            st.rerun()
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -1117,8 +1228,7 @@ elif st.session_state.run_stage == "complete":
         )
     with new_col:
         if st.button("🔄 Start New Campaign", use_container_width=True):
-            st.session_state.graph = create_graph()
-            st.session_state.config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            start_new_thread()
             st.session_state.run_stage = "entry"
             st.session_state.draft_feedback = {}
             st.session_state.draft_statuses = {}
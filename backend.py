@@ -1,8 +1,10 @@
 from fastapi import FastAPI, HTTPException, Header
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, SecretStr
+from typing import Optional, List, Dict, Any, Literal
 import os
 import sys
+import uuid
+import asyncio
 import logging
 
 logger = logging.getLogger("backend")
@@ -15,9 +17,19 @@ from src.langfuse_integration import get_langfuse_client, flush_langfuse, is_lan
 
 app = FastAPI(title="Geotab Marketing Campaign Orchestrator API")
 
+# Compiled once per worker; each request runs on its own checkpointer thread
+graph = create_graph(hitl=False)
+
+# Bulkhead: campaigns running at once in this worker. Requests beyond the limit are
+# rejected with 429 + Retry-After instead of queueing behind the LLM rate limit.
+MAX_CONCURRENT_CAMPAIGNS = int(os.getenv("MAX_CONCURRENT_CAMPAIGNS", "8"))
+RETRY_AFTER_SECONDS = 30
+_in_flight = 0
+
 class CampaignRequest(BaseModel):
     goal: str
     api_key: Optional[str] = None
+    mode: Literal["detailed", "fast"] = "detailed"  # "fast" = one combined plan/draft/review call
 
 class CampaignResponse(BaseModel):
     plan: Optional[List[str]] = None
@@ -34,64 +46,63 @@ def read_root():
 async def run_campaign(request: CampaignRequest, x_api_key: Optional[str] = Header(None)):
     
     # 1. Authentication
-    api_key = request.api_key or x_api_key or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
+    # Only a key the caller sent is forwarded per request; otherwise the LLM client
+    # reads its provider's key (GOOGLE_API_KEY / GROQ_API_KEY) from the environment
+    caller_key = request.api_key or x_api_key
+    if not (caller_key or os.environ.get("GOOGLE_API_KEY")):
         raise HTTPException(status_code=401, detail="Google API Key is required. Provide it in the request body, header (X-API-Key), or environment variable.")
     
-    # Set the environment variable for the agent to use
-    os.environ["GOOGLE_API_KEY"] = api_key
-
-    # 2. Initialize Langfuse Trace
-    langfuse_client = get_langfuse_client()
+    global _in_flight
+    if _in_flight >= MAX_CONCURRENT_CAMPAIGNS:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many campaigns in progress. Please retry shortly.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    langfuse_client = None
     trace_id = None
     trace_url = None
-    
-    if langfuse_client and is_langfuse_enabled():
-        try:
-            trace = langfuse_client.trace(
-                name="marketing_campaign_workflow",
-                metadata={
-                    "goal": request.goal,
-                    "api_endpoint": "/run_campaign"
-                },
-                input={"goal": request.goal}
-            )
-            trace_id = trace.id
-            trace_url = trace.get_trace_url()
-            logger.info(f"✓ Langfuse trace started: {trace_url}")
-        except Exception as e:
-            logger.warning(f"Failed to create Langfuse trace: {e}")
-
-    # 3. Run the Graph
+    thread_id = f"api_request_{uuid.uuid4()}"
+    # Everything after taking the bulkhead slot sits in this try, so the finally
+    # always gives it back — including when Langfuse setup raises
     try:
-        graph = create_graph()
-        config = {"configurable": {"thread_id": "api_request"}}
+        _in_flight += 1
+
+        # 2. Initialize Langfuse Trace
+        langfuse_client = get_langfuse_client()
+        if langfuse_client and is_langfuse_enabled():
+            try:
+                trace = langfuse_client.trace(
+                    name="marketing_campaign_workflow",
+                    metadata={
+                        "goal": request.goal,
+                        "api_endpoint": "/run_campaign"
+                    },
+                    input={"goal": request.goal}
+                )
+                trace_id = trace.id
+                trace_url = trace.get_trace_url()
+                logger.info(f"✓ Langfuse trace started: {trace_url}")
+            except Exception as e:
+                logger.warning(f"Failed to create Langfuse trace: {e}")
+
+        # 3. Run the Graph
+        # The key rides in the run config rather than os.environ, which is shared by
+        # every concurrent request; SecretStr keeps it out of checkpoint/trace metadata.
+        config = {"configurable": {"thread_id": thread_id}}
+        if caller_key:
+            config["configurable"]["api_key"] = SecretStr(caller_key)
         
         # Initial state with Langfuse trace ID
-        initial_input = {"goal": request.goal}
+        initial_input = {"goal": request.goal, "mode": request.mode}
         if trace_id:
             initial_input["langfuse_trace_id"] = trace_id
         
-        # We invoke the graph. 
-        # Note: The graph is designed to stop at 'reviewer'. 
-        # For a one-shot API, we might want to run it all the way or handle the interruption.
-        # For this v1, we will run it and if it stops, we resume it immediately or just return the state.
-        
-        # Initial run (Planner -> Writer -> Reviewer(stop))
-        # The create_graph() in agents.py sends interrupt_before=["reviewer"]
-        
-        # First invocation
-        initial_state = graph.invoke(initial_input, config=config)
-        
-        # To make it fully autonomous for the API, we can resume execution to run the reviewer
-        # If the state has 'critique', it means it finished. 
-        # If it paused at reviewer, we should resume.
-        
-        # Let's inspect the graph state to see if we need to resume.
-        # However, simplicity: The current graph stops BEFORE reviewer.
-        # If we want the critique, we need to invoke it again with None.
-        
-        final_state = graph.invoke(None, config=config) # Resume to run Reviewer
+        # The API graph is compiled without HITL pauses: a single invoke runs
+        # planner → writing loop → reviewer and stops before brand_review_gate.
+        # graph.invoke makes blocking LLM/API calls — run it off the event loop so
+        # concurrent requests can overlap their I/O.
+        final_state = await asyncio.to_thread(graph.invoke, initial_input, config=config)
         
         # Update Langfuse trace with final output
         if langfuse_client and trace_id:
@@ -123,6 +134,10 @@ async def run_campaign(request: CampaignRequest, x_api_key: Optional[str] = Head
                 pass
         raise HTTPException(status_code=500, detail=str(e))
     finally:
+        _in_flight -= 1
+        # API threads are never resumed — drop their checkpoints so the shared graph's
+        # checkpointer doesn't keep every request's state for the life of the worker
+        graph.checkpointer.delete_thread(thread_id)
         # Flush Langfuse events
         flush_langfuse()
 
@@ -1,33 +1,51 @@
 from typing import TypedDict, List, Annotated, Dict, Optional, Literal
 import os
+import re
+import json
+import functools
 import operator
 import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
 from pydantic import BaseModel, Field
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
-import guardrails as gd
-from guardrails.validators import Validator, register_validator, PassResult, FailResult
 
 from src.config import (
     DEFAULT_MODEL,
+    MAX_PARALLEL_LLM_CALLS,
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_PATH,
     get_llm,
-    COMPETITORS,
+    get_structured_llm,
+    chitchat_model,
     ROUTER_PROMPT,
     PLANNER_PROMPT,
     WRITER_PROMPT,
     WRITER_FEEDBACK_PROMPT,
     WRITER_VARIANT_PROMPT,
     REVIEWER_PROMPT,
-    RETRIEVAL_GRADER_PROMPT,
-    HALLUCINATION_GRADER_PROMPT,
+    REVIEWER_BATCH_PROMPT,
+    GRADER_PROMPT,
     QUERY_REWRITER_PROMPT,
     COMPLIANCE_CHECKER_PROMPT,
+    FAST_PIPELINE_PROMPT,
     PERFORMANCE_ESTIMATOR_PROMPT,
 )
-from src.tools import get_tools
+from src.tools import (
+    get_tools,
+    CampaignPerformanceEstimatorTool,
+    ComplianceCheckerTool,
+    ContentQualityTool,
+)
+from src.google_utils import create_doc, add_calendar_event, get_google_credentials
+from src.guards import redact_competitors
+from src.rag import get_brand_guidelines, retrieve_context, retrieve_many
 from src.langfuse_integration import (
     get_langfuse_handler,
     get_langfuse_client,
@@ -43,12 +61,37 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("MarketingAgent")
 
+# --- Prompt Templates (parsed once at import) ---
+
+ROUTER_TEMPLATE = ChatPromptTemplate.from_template(ROUTER_PROMPT)
+PLANNER_TEMPLATE = ChatPromptTemplate.from_template(PLANNER_PROMPT)
+WRITER_TEMPLATE = ChatPromptTemplate.from_template(WRITER_PROMPT)
+WRITER_FEEDBACK_TEMPLATE = ChatPromptTemplate.from_template(WRITER_FEEDBACK_PROMPT)
+WRITER_VARIANT_TEMPLATE = ChatPromptTemplate.from_template(WRITER_VARIANT_PROMPT)
+REVIEWER_TEMPLATE = ChatPromptTemplate.from_template(REVIEWER_PROMPT)
+GRADER_TEMPLATE = ChatPromptTemplate.from_template(GRADER_PROMPT)
+QUERY_REWRITER_TEMPLATE = ChatPromptTemplate.from_template(QUERY_REWRITER_PROMPT)
+FAST_PIPELINE_TEMPLATE = ChatPromptTemplate.from_template(FAST_PIPELINE_PROMPT)
+
 # --- State Definition ---
 
+def _merge_drafts(left: Optional[Dict[str, str]], right: Optional[Dict[str, Optional[str]]]) -> Dict[str, str]:
+    """
+    Reducer for per-asset text maps: nodes return only the assets they changed,
+    and a None value is a tombstone that removes that asset.
+    """
+    merged = dict(left or {})
+    for asset, text in (right or {}).items():
+        if text is None:
+            merged.pop(asset, None)
+        else:
+            merged[asset] = text
+    return merged
+
 class AgentState(TypedDict):
     goal: str
     plan: List[str]
-    drafts: Dict[str, str]
+    drafts: Annotated[Dict[str, str], _merge_drafts]   # Per-asset deltas; None removes
     critique: str
     messages: Annotated[List[BaseMessage], operator.add]
     intent: str
@@ -67,12 +110,14 @@ class AgentState(TypedDict):
     generation_grounded: bool            # Whether the last generation is grounded in docs
     rewritten_query: Optional[str]       # Query rewriter output (not the original goal)
     confidence_scores: Dict[str, float]  # Per-asset quality confidence 0.0–1.0
+    asset_contexts: Dict[str, str]       # Prefetched per-asset retrieval context (default queries)
+    mode: str                            # "detailed" (default, multi-node) or "fast" (single combined call)
     # --- Feature: Compliance Checker ---
     compliance_flags: Dict[str, List[Dict]]   # Per asset: [{severity, issue, suggestion}]
     compliance_summary: Dict[str, str]         # Per asset: "PASS" / "WARN" / "BLOCK"
     compliance_acknowledged: bool              # Whether user acknowledged HIGH flags
     # --- Feature: Audience Variant Generator ---
-    draft_variants: Dict[str, str]             # Per asset: variant draft text
+    draft_variants: Annotated[Dict[str, str], _merge_drafts]  # Per asset: variant draft text
     # --- Feature: Performance Estimator ---
     performance_estimates: Dict[str, Dict]     # Per asset: {metric: value}
     # --- Feature: Brand Review Gate ---
@@ -93,17 +138,40 @@ class Plan(BaseModel):
     steps: List[str] = Field(description="List of marketing assets to generate.")
     reasoning: str = Field(description="Reasoning for choosing these assets.")
 
-class GradeRetrieval(BaseModel):
-    """Binary score for relevance check."""
-    binary_score: Literal["yes", "no"] = Field(description="Relevance score 'yes' or 'no'")
+class GradeBoth(BaseModel):
+    """Binary scores for retrieval relevance and generation grounding."""
+    retrieval: Literal["yes", "no"] = Field(description="Are the retrieved facts relevant to the question? 'yes' or 'no'")
+    hallucination: Literal["yes", "no"] = Field(description="Is the generation grounded in the retrieved facts? 'yes' or 'no'")
+
+class AssetVerdict(BaseModel):
+    """Brand compliance verdict for one asset."""
+    asset_id: str = Field(description="The asset ID exactly as given in the prompt, e.g. 'A1'.")
+    verdict: str = Field(description="The structured brand compliance verdict for this asset.")
+
+class CampaignAsset(BaseModel):
+    name: str = Field(description="Asset name in '[Channel]: [Specific description]' format.")
+    draft: str = Field(description="The full draft of this asset.")
+    critique: str = Field(description="Brand compliance review of the draft.")
+
+class Campaign(BaseModel):
+    reasoning: str = Field(description="Brief explanation of why these assets were chosen.")
+    assets: List[CampaignAsset] = Field(description="3–5 planned assets, each drafted and reviewed.")
+
+class Critiques(BaseModel):
+    """Brand compliance verdicts for all reviewed assets."""
+    reviews: List[AssetVerdict] = Field(description="One verdict per asset ID.")
 
-class GradeHallucination(BaseModel):
-    """Binary score for hallucination check."""
-    binary_score: Literal["yes", "no"] = Field(description="Hallucination score 'yes' or 'no'")
+def _api_key(config: Optional[RunnableConfig]) -> Optional[str]:
+    """
+    Per-request LLM API key from the run config, if the caller supplied one.
+    It travels as a SecretStr so it is never copied into checkpoint or trace metadata.
+    """
+    secret = ((config or {}).get("configurable") or {}).get("api_key")
+    return secret.get_secret_value() if secret else None
 
 # --- Router Node ---
 
-def router_node(state: AgentState) -> Dict:
+def router_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
     """Classifies the user query intent."""
     logger.info("--- ROUTER ---")
     goal = state.get("goal", "")
@@ -112,11 +180,9 @@ def router_node(state: AgentState) -> Dict:
     langfuse_handler = get_langfuse_handler()
     callbacks = [langfuse_handler] if langfuse_handler else []
     
-    llm = get_llm(temperature=0)
-    structured_llm = llm.with_structured_output(RouterOutput)
+    structured_llm = get_structured_llm(RouterOutput, api_key=_api_key(config))
     
-    prompt = ChatPromptTemplate.from_template(ROUTER_PROMPT)
-    chain = prompt | structured_llm
+    chain = ROUTER_TEMPLATE | structured_llm
     
     logger.info(f"Input Goal: {goal}")
     result = chain.invoke({"goal": goal}, config={"callbacks": callbacks})
@@ -129,64 +195,48 @@ def router_node(state: AgentState) -> Dict:
 
 # --- Grader Nodes ---
 
-def retrieval_grader(state: AgentState) -> Dict:
-    """Grades if the retrieved documents are relevant to the question."""
-    logger.info("--- RETRIEVAL GRADER ---")
+def grader_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """Grades retrieval relevance and draft grounding in one structured call."""
+    logger.info("--- GRADER ---")
     question = state.get("rewritten_query") or state.get("goal")
     docs = state.get("retrieved_docs")
+    current_asset = state.get("current_asset")
+    generation = state.get("drafts", {}).get(current_asset, "")
+
+    if docs == "":
+        # Retrieval was skipped — there are no facts to grade or ground against
+        return {"retrieved_docs_relevant": False, "generation_grounded": True}
 
     # Get Langfuse callback handler
     langfuse_handler = get_langfuse_handler()
     callbacks = [langfuse_handler] if langfuse_handler else []
 
-    llm = get_llm(temperature=0)
-    structured_llm = llm.with_structured_output(GradeRetrieval)
+    structured_llm = get_structured_llm(GradeBoth, api_key=_api_key(config))
 
-    prompt = ChatPromptTemplate.from_template(RETRIEVAL_GRADER_PROMPT)
-    chain = prompt | structured_llm
+    chain = GRADER_TEMPLATE | structured_llm
 
-    result = chain.invoke({"question": question, "document": docs}, config={"callbacks": callbacks})
-    is_relevant = result.binary_score == "yes"
-    logger.info(f"Retrieval Relevance: {result.binary_score} → retrieved_docs_relevant={is_relevant}")
+    result = chain.invoke(
+        {"question": question, "documents": docs, "generation": generation},
+        config={"callbacks": callbacks},
+    )
+    is_relevant = result.retrieval == "yes"
+    is_grounded = result.hallucination == "yes"
+    logger.info(
+        f"Retrieval Relevance: {result.retrieval} → retrieved_docs_relevant={is_relevant}, "
+        f"Hallucination Grade: {result.hallucination} → generation_grounded={is_grounded}"
+    )
 
     # Track relevance score with Langfuse
     trace_id = state.get("langfuse_trace_id")
     if trace_id:
-        track_retrieval_metrics(trace_id, question, 0, result.binary_score)
-
-    return {
-        "retrieved_docs_relevant": is_relevant,
-        "reasoning_trace": state.get("reasoning_trace", "") + f"\nRetrieval Grade: {result.binary_score}",
-    }
-
-def hallucination_grader(state: AgentState) -> Dict:
-    """Grades if the generated answer is grounded in the retrieved documents."""
-    logger.info("--- HALLUCINATION GRADER ---")
-    docs = state.get("retrieved_docs")
-    current_asset = state.get("current_asset")
-    generation = state.get("drafts", {}).get(current_asset, "")
-
-    # Get Langfuse callback handler
-    langfuse_handler = get_langfuse_handler()
-    callbacks = [langfuse_handler] if langfuse_handler else []
-
-    llm = get_llm(temperature=0)
-    structured_llm = llm.with_structured_output(GradeHallucination)
-
-    prompt = ChatPromptTemplate.from_template(HALLUCINATION_GRADER_PROMPT)
-    chain = prompt | structured_llm
-
-    result = chain.invoke({"documents": docs, "generation": generation}, config={"callbacks": callbacks})
-    is_grounded = result.binary_score == "yes"
-    logger.info(f"Hallucination Grade: {result.binary_score} → generation_grounded={is_grounded}")
+        track_retrieval_metrics(trace_id, question, 0, result.retrieval)
 
     # Compute per-asset confidence score from retrieval + hallucination signals
-    retrieved_relevant = state.get("retrieved_docs_relevant", False)
-    if retrieved_relevant and is_grounded:
+    if is_relevant and is_grounded:
         confidence = 1.0
-    elif retrieved_relevant and not is_grounded:
+    elif is_relevant and not is_grounded:
         confidence = 0.5
-    elif not retrieved_relevant and is_grounded:
+    elif not is_relevant and is_grounded:
         confidence = 0.6
     else:
         confidence = 0.2
@@ -197,29 +247,16 @@ def hallucination_grader(state: AgentState) -> Dict:
     logger.info(f"Confidence score for '{current_asset}': {confidence:.0%}")
 
     return {
+        "retrieved_docs_relevant": is_relevant,
         "generation_grounded": is_grounded,
         "confidence_scores": new_confidence_scores,
-        "reasoning_trace": state.get("reasoning_trace", "") + f"\nHallucination Grade: {result.binary_score}",
+        "reasoning_trace": state.get("reasoning_trace", "")
+        + f"\nRetrieval Grade: {result.retrieval}\nHallucination Grade: {result.hallucination}",
     }
 
-@register_validator(name="competitor_check", data_type="string")
-class CompetitorCheck(Validator):
-    def __init__(self, competitors: List[str], on_fail: str = "fix"):
-        super().__init__(on_fail=on_fail, competitors=competitors)
-        self.competitors = competitors
-
-    def validate(self, value: str, metadata: Dict = {}) -> gd.validators.ValidationResult:
-        for competitor in self.competitors:
-            if competitor.lower() in value.lower():
-                return FailResult(
-                    error_message=f"Value contains competitor: {competitor}",
-                    fix_value=value.replace(competitor, "[REDACTED]")
-                )
-        return PassResult()
-
 # --- Agent Nodes ---
 
-def planner_node(state: AgentState) -> Dict:
+def planner_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
     """
     Generates a marketing plan (Pass 1) then estimates KPIs per asset (Pass 2).
     Pass 2 uses function calling to fetch industry benchmarks via CampaignPerformanceEstimatorTool.
@@ -230,18 +267,15 @@ def planner_node(state: AgentState) -> Dict:
     langfuse_handler = get_langfuse_handler()
     callbacks = [langfuse_handler] if langfuse_handler else []
 
-    llm = get_llm(temperature=0)
-    structured_llm = llm.with_structured_output(Plan)
+    structured_llm = get_structured_llm(Plan, api_key=_api_key(config))
 
-    prompt = ChatPromptTemplate.from_template(PLANNER_PROMPT)
-    chain = prompt | structured_llm
+    chain = PLANNER_TEMPLATE | structured_llm
 
     logger.info(f"LLM Input: {goal}")
     result = chain.invoke({"goal": goal}, config={"callbacks": callbacks})
     logger.info(f"LLM Output (Plan): {result.steps}")
 
     # ── Pass 2: Performance Estimator ────────────────────────────────────────
-    from src.tools import CampaignPerformanceEstimatorTool
     estimator_tool = CampaignPerformanceEstimatorTool()
     performance_estimates: Dict[str, Dict] = {}
 
@@ -269,6 +303,43 @@ def planner_node(state: AgentState) -> Dict:
         "reasoning_trace": state.get("reasoning_trace", "") + f"\nPlanner Reasoning: {result.reasoning}",
     }
 
+# Goals that are pure small talk (or too short to search on) skip the knowledge base
+_SMALL_TALK = re.compile(r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|test)\b[\s!.?]*$", re.IGNORECASE)
+MIN_RETRIEVAL_WORDS = 3
+
+@functools.lru_cache(maxsize=1)
+def _retriever_tool():
+    """Knowledge-base retriever tool, looked up once per process."""
+    return next(t for t in get_tools() if t.name == "knowledge_base_retriever")
+
+def should_retrieve(goal: str, intent: Optional[str]) -> bool:
+    """Cheap pre-gate: only search the knowledge base for substantive Factual/Analytical goals."""
+    if intent and intent not in ("Factual", "Analytical"):
+        return False
+    if not goal or _SMALL_TALK.match(goal):
+        return False
+    return len(goal.split()) >= MIN_RETRIEVAL_WORDS
+
+def context_prefetch_node(state: AgentState) -> Dict:
+    """
+    Retrieves the default-query context for every planned asset in one batched pass
+    (one embedding call, then vector searches) before the writing loop starts,
+    so no asset waits on the previous asset's retrieval.
+    """
+    logger.info("--- CONTEXT PREFETCH ---")
+    goal = state.get("goal")
+    plan = state.get("plan", [])
+    if not plan or not should_retrieve(goal, state.get("intent")):
+        return {}
+
+    try:
+        contexts = retrieve_many([f"{asset} related to {goal}" for asset in plan])
+    except Exception as e:
+        logger.warning(f"Context prefetch failed ({e}), the retriever will fetch per asset.")
+        return {}
+    logger.info(f"Prefetched context for {len(contexts)} assets")
+    return {"asset_contexts": dict(zip(plan, contexts))}
+
 def retriever_node(state: AgentState) -> Dict:
     """Retrieves context using the retriever tool."""
     logger.info("--- RETRIEVER ---")
@@ -293,14 +364,27 @@ def retriever_node(state: AgentState) -> Dict:
         retry_count = 0
         rewritten_query = None  # Fresh start for each new asset
 
-    tools = get_tools()
-    retriever_tool = next(t for t in tools if t.name == "knowledge_base_retriever")
+    if not should_retrieve(goal, state.get("intent")):
+        logger.info("Retriever — goal doesn't need the knowledge base, skipping retrieval")
+        return {
+            "retrieved_docs": "",
+            "current_asset": current_asset,
+            "retry_count": retry_count,
+            "rewritten_query": None,
+        }
 
     # Prefer rewritten query over raw goal for better recall
     query = rewritten_query if rewritten_query else f"{current_asset} related to {goal}"
-    logger.info(f"Tool Call (Retriever) — query: {query}")
 
-    context = retriever_tool.run(query)
+    # Default queries were fetched for the whole plan by context_prefetch
+    asset_contexts = state.get("asset_contexts") or {}
+    if not rewritten_query and current_asset in asset_contexts:
+        logger.info(f"Retriever — prefetched context for: {current_asset}")
+        context = asset_contexts[current_asset]
+    else:
+        retriever_tool = _retriever_tool()
+        logger.info(f"Tool Call (Retriever) — query: {query}")
+        context = retriever_tool.run(query)
     logger.info(f"Tool Output (Retriever): {context[:200]}...")
 
     # Track retrieval metrics with Langfuse
@@ -316,8 +400,13 @@ def retriever_node(state: AgentState) -> Dict:
         "rewritten_query": rewritten_query,
     }
 
-def writer_node(state: AgentState) -> Dict:
-    """Generates content for a specific asset."""
+def writer_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """
+    Generates content for a specific asset.
+    The graph's run config is merged into the LLM call so its callbacks stay attached:
+    with stream_mode="messages" the draft streams token by token to the UI, while
+    guardrails still run once on the completed text.
+    """
     logger.info("--- WRITER ---")
     goal = state.get("goal")
     plan = state.get("plan", [])
@@ -339,96 +428,109 @@ def writer_node(state: AgentState) -> Dict:
     # Get Langfuse callback handler
     langfuse_handler = get_langfuse_handler()
     callbacks = [langfuse_handler] if langfuse_handler else []
+    run_config = merge_configs(config, {"callbacks": callbacks})
 
     # Use higher temperature for creative writing
-    llm = get_llm(temperature=0.7)
+    llm = get_llm(temperature=0.7, api_key=_api_key(config))
 
     # Check if there's user feedback for this asset (regeneration case)
     feedback_text = user_feedback.get(current_asset, "")
     if feedback_text:
         logger.info(f"Regenerating {current_asset} with user feedback: {feedback_text}")
-        prompt = ChatPromptTemplate.from_template(WRITER_FEEDBACK_PROMPT)
-        chain = prompt | llm
+        chain = WRITER_FEEDBACK_TEMPLATE | llm
         result = chain.invoke({
             "asset_type": current_asset,
             "context": context,
             "goal": goal,
             "feedback": feedback_text
-        }, config={"callbacks": callbacks})
+        }, config=run_config)
     else:
-        prompt = ChatPromptTemplate.from_template(WRITER_PROMPT)
-        chain = prompt | llm
+        chain = WRITER_TEMPLATE | llm
         logger.info(f"Writing asset: {current_asset}")
         logger.info(f"LLM Input (Writer): Goal={goal}, Asset={current_asset}, Context Length={len(context)}")
-        result = chain.invoke({"asset_type": current_asset, "context": context, "goal": goal}, config={"callbacks": callbacks})
+        result = chain.invoke({"asset_type": current_asset, "context": context, "goal": goal}, config=run_config)
     logger.info(f"LLM Output (Writer): {result.content[:200]}...")
     
-    # --- Guardrails Integration ---
+    # --- Guardrails: redact competitor names (list loaded from config) ---
     logger.info(f"--- GUARDRAILS CHECK for {current_asset} ---")
-    
-    # Initialize Guard with validators — competitor list loaded from config
-    guard = gd.Guard().use(
-        CompetitorCheck(competitors=COMPETITORS, on_fail="fix")
-    )
-    
-    try:
-        # Validate the generated content
-        raw_content = result.content
-        validation_result = guard.parse(raw_content)
-        validated_content = validation_result.validated_output
-        
-        # Track guardrails validation with Langfuse
-        trace_id = state.get("langfuse_trace_id")
-        if trace_id:
-            passed = (validated_content == raw_content)
-            details = "Content validated successfully" if passed else "Content modified by guardrails"
-            track_guardrails_validation(trace_id, current_asset, passed, details)
-        
-        if validated_content != raw_content:
-            logger.info(f"Guardrails modified the content for {current_asset}")
-            reasoning_addition = f"\nWriter: Generated {current_asset} (Guardrails applied fixes)"
-        else:
-            logger.info(f"Guardrails passed for {current_asset}")
-            reasoning_addition = f"\nWriter: Generated {current_asset}"
-            
-    except Exception as e:
-        logger.error(f"Guardrails error: {e}")
-        validated_content = result.content # Fallback to original content
-        reasoning_addition = f"\nWriter: Generated {current_asset} (Guardrails check failed: {str(e)})"
+    raw_content = result.content
+    validated_content = redact_competitors(raw_content)
+    passed = validated_content == raw_content
 
-    new_drafts = drafts.copy()
-    new_drafts[current_asset] = validated_content
+    # Track guardrails validation with Langfuse
+    trace_id = state.get("langfuse_trace_id")
+    if trace_id:
+        details = "Content validated successfully" if passed else "Content modified by guardrails"
+        track_guardrails_validation(trace_id, current_asset, passed, details)
 
-    # ── Audience Variant Generation ───────────────────────────────────────────
-    variant_drafts = (state.get("draft_variants") or {}).copy()
-    primary_audience, variant_audience = _detect_audiences(current_asset, goal)
-    try:
-        variant_prompt = ChatPromptTemplate.from_template(WRITER_VARIANT_PROMPT)
-        variant_chain = variant_prompt | get_llm(temperature=0.7)
-        variant_result = variant_chain.invoke(
-            {
-                "asset_type": current_asset,
-                "primary_audience": primary_audience,
-                "variant_audience": variant_audience,
-                "goal": goal,
-                "primary_draft": validated_content,
-            },
-            config={"callbacks": callbacks},
-        )
-        variant_drafts[current_asset] = variant_result.content
-        logger.info(f"Variant draft generated for '{current_asset}' → audience: {variant_audience}")
-        reasoning_addition += f" + variant ({variant_audience})"
-    except Exception as e:
-        logger.warning(f"Variant generation failed for '{current_asset}': {e}")
-        variant_drafts[current_asset] = ""
+    if not passed:
+        logger.info(f"Guardrails modified the content for {current_asset}")
+        reasoning_addition = f"\nWriter: Generated {current_asset} (Guardrails applied fixes)"
+    else:
+        logger.info(f"Guardrails passed for {current_asset}")
+        reasoning_addition = f"\nWriter: Generated {current_asset}"
 
+    # The primary draft changed, so any existing variant is stale — variant_writer
+    # regenerates variants for all assets in parallel once the writing loop finishes.
     return {
-        "drafts": new_drafts,
-        "draft_variants": variant_drafts,
+        "drafts": {current_asset: validated_content},
+        "draft_variants": {current_asset: None},
         "current_asset": current_asset,
         "reasoning_trace": state.get("reasoning_trace", "") + reasoning_addition,
     }
 
+def _write_variant(asset: str, primary_draft: str, goal: str, callbacks: List, api_key: Optional[str] = None) -> str:
+    """Rewrites one primary draft for its complementary audience segment."""
+    primary_audience, variant_audience = _detect_audiences(asset, goal)
+    variant_chain = WRITER_VARIANT_TEMPLATE | get_llm(temperature=0.7, api_key=api_key)
+    variant_result = variant_chain.invoke(
+        {
+            "asset_type": asset,
+            "primary_audience": primary_audience,
+            "variant_audience": variant_audience,
+            "goal": goal,
+            "primary_draft": primary_draft,
+        },
+        config={"callbacks": callbacks},
+    )
+    logger.info(f"Variant draft generated for '{asset}' → audience: {variant_audience}")
+    return variant_result.content
+
+def variant_writer_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """
+    Generates audience variants for every draft that lacks one, concurrently.
+    Runs once after the writing loop instead of inside each writer step, so variant
+    latency is paid roughly once per pass rather than once per asset.
+    """
+    logger.info("--- VARIANT WRITER ---")
+    goal = state.get("goal")
+    drafts = state.get("drafts", {})
+    existing = state.get("draft_variants") or {}
+
+    pending = [asset for asset in drafts if not existing.get(asset)]
+    if not pending:
+        return {}
+
+    langfuse_handler = get_langfuse_handler()
+    callbacks = [langfuse_handler] if langfuse_handler else []
+    api_key = _api_key(config)
+
+    def write(asset: str) -> str:
+        try:
+            return _write_variant(asset, drafts[asset], goal, callbacks, api_key)
+        except Exception as e:
+            logger.warning(f"Variant generation failed for '{asset}': {e}")
+            return ""
+
+    with ThreadPoolExecutor(max_workers=min(len(pending), MAX_PARALLEL_LLM_CALLS)) as executor:
+        variant_drafts = dict(zip(pending, executor.map(write, pending)))
+
+    generated = sum(1 for asset in pending if variant_drafts[asset])
+    return {
+        "draft_variants": variant_drafts,
+        "reasoning_trace": state.get("reasoning_trace", "") + f"\nVariant Writer: {generated}/{len(pending)} audience variants",
+    }
+
 def _detect_audiences(asset_name: str, goal: str) -> tuple[str, str]:
     """
     Infers primary and variant audience segments from the asset name / goal.
@@ -471,8 +573,6 @@ def compliance_checker_node(state: AgentState) -> Dict:
     HIGH flags → summary = "BLOCK"; any flag → "WARN"; clean → "PASS".
     """
     logger.info("--- COMPLIANCE CHECKER ---")
-    from src.tools import ComplianceCheckerTool
-    import json as _json
 
     checker = ComplianceCheckerTool()
     drafts = state.get("drafts", {})
@@ -483,7 +583,7 @@ def compliance_checker_node(state: AgentState) -> Dict:
     for asset, content in drafts.items():
         try:
             raw = checker.run({"asset_type": asset, "content": content})
-            result = _json.loads(raw)
+            result = json.loads(raw)
             flags = result.get("flags", [])
             has_high = any(f["severity"] == "HIGH" for f in flags)
             has_any = len(flags) > 0
@@ -501,86 +601,221 @@ def compliance_checker_node(state: AgentState) -> Dict:
     }
 
 
-def reviewer_node(state: AgentState) -> Dict:
+def _review_asset(asset: str, content: str, guidelines: str, callbacks: List, api_key: Optional[str] = None) -> str:
+    """
+    Reviews a single draft with the ContentQualityTool function-calling loop.
+    Returns the formatted critique section for the asset.
+    """
+    logger.info(f"Reviewing (function calling): {asset}")
+
+    quality_tool = ContentQualityTool()
+
+    llm = get_llm(temperature=0, api_key=api_key)
+    llm_with_tools = llm.bind_tools([quality_tool])
+
+    review_prompt = (
+        f"You are a brand compliance officer for Wealthsimple.\n\n"
+        f"Brand Guidelines (excerpt):\n{guidelines[:600]}\n\n"
+        f"Asset Type: {asset}\n"
+        f"Content:\n{content[:1500]}\n\n"
+        f"Step 1: Call the content_quality_analyzer tool to get an objective quality report.\n"
+        f"Step 2: Use the tool results + brand guidelines to write your final compliance verdict."
+    )
+
+    messages = [HumanMessage(content=review_prompt)]
+
+    # Round 1 — LLM decides to call the tool
+    ai_response = llm_with_tools.invoke(messages, config={"callbacks": callbacks})
+    messages.append(ai_response)
+
+    quality_report = ""
+    if hasattr(ai_response, "tool_calls") and ai_response.tool_calls:
+        for tool_call in ai_response.tool_calls:
+            logger.info(f"LLM invoked function: {tool_call['name']} for '{asset}'")
+            try:
+                tool_result = quality_tool.run(tool_call["args"])
+                quality_report = tool_result
+                messages.append(
+                    ToolMessage(content=tool_result, tool_call_id=tool_call["id"])
+                )
+            except Exception as e:
+                err_msg = f"Tool error: {e}"
+                messages.append(
+                    ToolMessage(content=err_msg, tool_call_id=tool_call["id"])
+                )
+
+        # Round 2 — LLM writes verdict using tool results
+        final_response = llm.invoke(messages, config={"callbacks": callbacks})
+        return _format_review(asset, quality_report, final_response.content)
+
+    # LLM skipped the tool — fall back to direct prompt
+    logger.warning(f"LLM did not call tool for '{asset}', using direct review.")
+    chain = REVIEWER_TEMPLATE | llm
+    result = chain.invoke(
+        {"guidelines": guidelines, "asset": asset, "content": content},
+        config={"callbacks": callbacks},
+    )
+    return f"**{asset} Review:**\n{result.content}\n\n{'─'*40}\n\n"
+
+
+def _format_review(asset: str, quality_report: str, verdict: str) -> str:
+    """Formats one asset's section of the combined critique."""
+    return (
+        f"**{asset}**\n\n"
+        f"*Quality Report (automated):*\n```\n{quality_report}\n```\n\n"
+        f"*Brand Compliance Verdict:*\n{verdict}\n\n"
+        f"{'─'*40}\n\n"
+    )
+
+
+def _review_assets_individually(drafts: Dict[str, str], guidelines: str, callbacks: List, api_key: Optional[str] = None) -> List[str]:
+    """Per-asset review fallback — one function-calling loop per draft, run concurrently."""
+    # Each review is I/O-bound on the LLM API — fan out across a small thread pool.
+    # map() preserves draft order in the combined critique.
+    max_workers = min(len(drafts), MAX_PARALLEL_LLM_CALLS)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(
+            lambda item: _review_asset(item[0], item[1], guidelines, callbacks, api_key),
+            drafts.items(),
+        ))
+
+
+def reviewer_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
     """
-    Reviews drafts using LLM function calling.
-    The LLM autonomously calls ContentQualityTool for each asset to get objective
-    quality metrics, then issues a structured brand compliance verdict.
+    Reviews all drafts in a single batched LLM conversation using function calling.
+    The LLM calls ContentQualityTool once per asset (in one response) to get objective
+    quality metrics, then returns structured verdicts keyed by asset ID.
+    Falls back to concurrent per-asset reviews if the batched verdicts are incomplete.
     """
-    logger.info("--- REVIEWER (Function Calling) ---")
+    logger.info("--- REVIEWER (Function Calling, batched) ---")
     drafts = state.get("drafts", {})
-    guidelines = state.get("retrieved_docs", "Use standard professional tone.")
 
     langfuse_handler = get_langfuse_handler()
     callbacks = [langfuse_handler] if langfuse_handler else []
 
-    from src.tools import ContentQualityTool
-    quality_tool = ContentQualityTool()
-
-    llm = get_llm(temperature=0)
-    llm_with_tools = llm.bind_tools([quality_tool])
+    if not drafts:
+        return {"critique": ""}
 
-    critique_parts = []
+    # Brand guidelines are static between ingests — use the cached excerpt rather than
+    # whatever context was last retrieved for the final asset.
+    try:
+        guidelines = get_brand_guidelines() or "Use standard professional tone."
+    except Exception as e:
+        logger.warning(f"Brand guidelines retrieval failed ({e}), using default tone guidance.")
+        guidelines = "Use standard professional tone."
 
-    for asset, content in drafts.items():
-        logger.info(f"Reviewing (function calling): {asset}")
+    quality_tool = ContentQualityTool()
 
-        review_prompt = (
-            f"You are a brand compliance officer for Wealthsimple.\n\n"
-            f"Brand Guidelines (excerpt):\n{guidelines[:600]}\n\n"
-            f"Asset Type: {asset}\n"
-            f"Content:\n{content[:1500]}\n\n"
-            f"Step 1: Call the content_quality_analyzer tool to get an objective quality report.\n"
-            f"Step 2: Use the tool results + brand guidelines to write your final compliance verdict."
-        )
+    api_key = _api_key(config)
+    llm = get_llm(temperature=0, api_key=api_key)
+    llm_with_tools = llm.bind_tools([quality_tool])
 
-        messages = [HumanMessage(content=review_prompt)]
+    # Short IDs keep the structured output compact and robust to long asset names
+    asset_ids = {f"A{i}": asset for i, asset in enumerate(drafts, 1)}
+    assets_block = "\n\n".join(
+        f"### {asset_id} — {asset}\n{drafts[asset][:1500]}" for asset_id, asset in asset_ids.items()
+    )
+    review_prompt = REVIEWER_BATCH_PROMPT.format(guidelines=guidelines[:600], assets=assets_block)
+    messages = [HumanMessage(content=review_prompt)]
 
-        # Round 1 — LLM decides to call the tool
+    quality_reports: Dict[str, str] = {}
+    try:
+        # Round 1 — LLM issues one tool call per asset
         ai_response = llm_with_tools.invoke(messages, config={"callbacks": callbacks})
         messages.append(ai_response)
 
-        quality_report = ""
-        if hasattr(ai_response, "tool_calls") and ai_response.tool_calls:
-            for tool_call in ai_response.tool_calls:
-                logger.info(f"LLM invoked function: {tool_call['name']} for '{asset}'")
-                try:
-                    tool_result = quality_tool.run(tool_call["args"])
-                    quality_report = tool_result
-                    messages.append(
-                        ToolMessage(content=tool_result, tool_call_id=tool_call["id"])
-                    )
-                except Exception as e:
-                    err_msg = f"Tool error: {e}"
-                    messages.append(
-                        ToolMessage(content=err_msg, tool_call_id=tool_call["id"])
-                    )
-
-            # Round 2 — LLM writes verdict using tool results
-            final_response = llm.invoke(messages, config={"callbacks": callbacks})
-            critique_parts.append(
-                f"**{asset}**\n\n"
-                f"*Quality Report (automated):*\n```\n{quality_report}\n```\n\n"
-                f"*Brand Compliance Verdict:*\n{final_response.content}\n\n"
-                f"{'─'*40}\n\n"
-            )
-        else:
-            # LLM skipped the tool — fall back to direct prompt
-            logger.warning(f"LLM did not call tool for '{asset}', using direct review.")
-            prompt = ChatPromptTemplate.from_template(REVIEWER_PROMPT)
-            chain = prompt | llm
-            result = chain.invoke(
-                {"guidelines": guidelines, "asset": asset, "content": content},
-                config={"callbacks": callbacks},
+        for tool_call in getattr(ai_response, "tool_calls", None) or []:
+            requested = tool_call["args"].get("asset_type", "")
+            asset = asset_ids.get(requested, requested)
+            logger.info(f"LLM invoked function: {tool_call['name']} for '{asset}'")
+            try:
+                # Run against the real asset name so platform limits (email, linkedin, …) apply
+                args = {**tool_call["args"], "asset_type": asset} if asset in drafts else tool_call["args"]
+                tool_result = quality_tool.run(args)
+                if asset in drafts:
+                    quality_reports[asset] = tool_result
+            except Exception as e:
+                tool_result = f"Tool error: {e}"
+            messages.append(ToolMessage(content=tool_result, tool_call_id=tool_call["id"]))
+
+        # The analyzer is deterministic — fill in any asset the LLM skipped ourselves
+        skipped = [a for a in drafts if a not in quality_reports]
+        if skipped:
+            logger.warning(f"LLM did not call tool for {skipped}, running analyzer directly.")
+            for asset in skipped:
+                quality_reports[asset] = quality_tool.run({"asset_type": asset, "content": drafts[asset]})
+            reports_block = "\n\n".join(
+                f"### {asset_id}\n{quality_reports[asset]}"
+                for asset_id, asset in asset_ids.items() if asset in skipped
             )
-            critique_parts.append(f"**{asset} Review:**\n{result.content}\n\n{'─'*40}\n\n")
+            messages.append(HumanMessage(content=f"Quality reports for the remaining assets:\n\n{reports_block}"))
+
+        # Round 2 — one structured verdict per asset ID
+        result = get_structured_llm(Critiques, api_key=api_key).invoke(messages, config={"callbacks": callbacks})
+        verdicts = {r.asset_id: r.verdict for r in result.reviews}
+    except Exception as e:
+        logger.warning(f"Batched review failed ({e}), reviewing assets individually.")
+        return {"critique": "".join(_review_assets_individually(drafts, guidelines, callbacks, api_key))}
 
+    missing = {asset: drafts[asset] for asset_id, asset in asset_ids.items() if not verdicts.get(asset_id)}
+    if missing:
+        logger.warning(f"Batched review missing verdicts for {list(missing)}, reviewing individually.")
+        fallback = dict(zip(missing, _review_assets_individually(missing, guidelines, callbacks, api_key)))
+    else:
+        fallback = {}
+
+    critique_parts = [
+        fallback[asset] if asset in fallback else _format_review(asset, quality_reports[asset], verdicts[asset_id])
+        for asset_id, asset in asset_ids.items()
+    ]
     return {"critique": "".join(critique_parts)}
 
-def chitchat_node(state: AgentState) -> Dict:
-    """Handles chitchat."""
+def fast_pipeline_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """
+    Fast mode: plans, drafts and reviews the whole campaign in one structured LLM call,
+    with a single retrieval for the goal. Trades the per-asset grading/rewrite loop for
+    far fewer round-trips; the compliance check, brand review gate and publish
+    authorization still apply.
+    """
+    logger.info("--- FAST PIPELINE ---")
+    goal = state.get("goal")
+
+    langfuse_handler = get_langfuse_handler()
+    callbacks = [langfuse_handler] if langfuse_handler else []
+
+    try:
+        context = retrieve_context(goal)
+        guidelines = get_brand_guidelines() or "Use standard professional tone."
+    except Exception as e:
+        logger.warning(f"Fast pipeline retrieval failed ({e}), continuing without context.")
+        context, guidelines = "", "Use standard professional tone."
+
+    chain = FAST_PIPELINE_TEMPLATE | get_structured_llm(Campaign, temperature=0.7, api_key=_api_key(config))
+    result = chain.invoke(
+        {"goal": goal, "context": context, "guidelines": guidelines[:600]},
+        config={"callbacks": callbacks},
+    )
+    logger.info(f"LLM Output (Fast Pipeline): {[a.name for a in result.assets]}")
+
+    drafts: Dict[str, str] = {}
+    critiques = []
+    for asset in result.assets:
+        drafts[asset.name] = redact_competitors(asset.draft)
+        critiques.append(f"**{asset.name} Review:**\n{asset.critique}\n\n{'─'*40}\n\n")
+
+    return {
+        "plan": list(drafts),
+        "drafts": drafts,
+        "critique": "".join(critiques),
+        "retrieved_docs": context,
+        "current_asset": None,
+        "reasoning_trace": state.get("reasoning_trace", "") + f"\nFast Pipeline Reasoning: {result.reasoning}",
+    }
+
+def chitchat_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """Handles chitchat on the smaller chitchat model — no marketing work happens here."""
     logger.info("--- CHITCHAT ---")
-    llm = get_llm(temperature=0)
+    llm = get_llm(temperature=0, model=chitchat_model(), api_key=_api_key(config))
     result = llm.invoke(f"The user said: {state['goal']}. Respond politely.")
     return {"critique": result.content}
 
@@ -593,15 +828,14 @@ def increment_retry_node(state: AgentState) -> Dict:
     """Increments the retry count."""
     return {"retry_count": state.get("retry_count", 0) + 1}
 
-def query_rewriter_node(state: AgentState) -> Dict:
+def query_rewriter_node(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
     """Rewrites the query to improve retrieval — stores in rewritten_query, not goal."""
     logger.info("--- QUERY REWRITER ---")
     goal = state.get("goal")
     current_asset = state.get("current_asset", "marketing assets")
 
-    llm = get_llm(temperature=0)
-    prompt = ChatPromptTemplate.from_template(QUERY_REWRITER_PROMPT)
-    chain = prompt | llm
+    llm = get_llm(temperature=0, api_key=_api_key(config))
+    chain = QUERY_REWRITER_TEMPLATE | llm
 
     result = chain.invoke({"goal": goal, "asset_type": current_asset})
     rewritten = result.content.strip()
@@ -610,6 +844,8 @@ def query_rewriter_node(state: AgentState) -> Dict:
     return {
         "rewritten_query": rewritten,  # Preserve original goal; use this for next retrieval
         "retry_count": state.get("retry_count", 0) + 1,
+        # Drop the draft that failed grading so the retriever and writer redo this asset
+        "drafts": {current_asset: None},
     }
 
 def feedback_processor_node(state: AgentState) -> Dict:
@@ -618,7 +854,6 @@ def feedback_processor_node(state: AgentState) -> Dict:
     
     draft_status = state.get("draft_status", {})
     user_feedback = state.get("user_feedback", {})
-    drafts = state.get("drafts", {})
     trace_id = state.get("langfuse_trace_id")
     
     # Track user feedback with Langfuse
@@ -628,46 +863,58 @@ def feedback_processor_node(state: AgentState) -> Dict:
             track_user_feedback(trace_id, asset, feedback_text, status)
     
     # Find assets that need revision
-    assets_to_revise = [asset for asset, status in draft_status.items() if status == "needs_revision"]
+    revise = {asset for asset, status in draft_status.items() if status == "needs_revision"}
     
-    if assets_to_revise:
-        logger.info(f"Assets requiring revision: {assets_to_revise}")
-        # Remove drafts that need revision so they get regenerated
-        new_drafts = drafts.copy()
-        for asset in assets_to_revise:
-            if asset in new_drafts:
-                del new_drafts[asset]
-        
+    if revise:
+        logger.info(f"Assets requiring revision: {sorted(revise)}")
+        # Start with the first one in plan order — the same asset the retriever will pick
+        plan = state.get("plan", [])
+        first = next((asset for asset in plan if asset in revise), None) or next(iter(revise))
+        # Tombstone drafts that need revision so they get regenerated
         return {
-            "drafts": new_drafts,
+            "drafts": dict.fromkeys(revise),
             "feedback_iteration": state.get("feedback_iteration", 0) + 1,
-            "current_asset": assets_to_revise[0] if assets_to_revise else None
+            "current_asset": first,
         }
     
     return {"feedback_iteration": state.get("feedback_iteration", 0)}
 
 
+def _publish_asset(index: int, asset: str, content: str, goal: str) -> str:
+    """Creates the Google Doc for one asset, then schedules its Calendar event."""
+    logger.info(f"Publishing {asset}...")
+    # 1. Create Google Doc
+    doc_id, doc_url = create_doc(f"{asset} - {goal[:30]}", content)
+
+    # 2. Schedule in Calendar (e.g., publish in index+1 days)
+    publish_date = (datetime.now() + timedelta(days=index + 1)).isoformat() + "Z"
+    add_calendar_event(f"Publish {asset}", publish_date, f"Draft URL: {doc_url}")
+
+    return f"Doc: {doc_url} | Scheduled: {publish_date}"
+
 def publisher_node(state: AgentState) -> Dict:
-    """Publishes drafts to Google Docs and schedules in Calendar."""
+    """
+    Publishes drafts to Google Docs and schedules them in Calendar.
+    Assets are independent, so they are published concurrently; each asset's
+    Calendar event still follows its Doc, since the event links to the Doc URL.
+    """
     logger.info("--- PUBLISHER ---")
     drafts = state.get("drafts", {})
     goal = state.get("goal")
-    
-    from src.google_utils import create_doc, add_calendar_event
-    from datetime import datetime, timedelta
-    
-    results = {}
-    for i, (asset, content) in enumerate(drafts.items()):
-        logger.info(f"Publishing {asset}...")
-        # 1. Create Google Doc
-        doc_id, doc_url = create_doc(f"{asset} - {goal[:30]}", content)
-        
-        # 2. Schedule in Calendar (e.g., publish in i+1 days)
-        publish_date = (datetime.now() + timedelta(days=i+1)).isoformat() + "Z"
-        event_id = add_calendar_event(f"Publish {asset}", publish_date, f"Draft URL: {doc_url}")
-        
-        results[asset] = f"Doc: {doc_url} | Scheduled: {publish_date}"
-        
+    if not drafts:
+        return {"publish_results": {}}
+
+    # Resolve credentials once up front, so any OAuth prompt or token refresh
+    # happens a single time instead of racing across worker threads.
+    get_google_credentials()
+
+    def publish(item) -> str:
+        index, (asset, content) = item
+        return _publish_asset(index, asset, content, goal)
+
+    with ThreadPoolExecutor(max_workers=min(len(drafts), MAX_PARALLEL_LLM_CALLS)) as executor:
+        results = dict(zip(drafts, executor.map(publish, enumerate(drafts.items()))))
+
     return {"publish_results": results}
 
 # --- Routing Logic ---
@@ -678,32 +925,31 @@ def route_after_router(state: AgentState) -> str:
         return "chitchat"
     elif intent == "ClarificationNeeded":
         return "clarification"
+    elif state.get("mode") == "fast":
+        return "fast_pipeline"
     else:
         return "planner"
 
 def route_after_planner(state: AgentState) -> str:
-    return "retriever"
-
-def route_after_retriever(state: AgentState) -> str:
-    return "retrieval_grader"
-
-def route_after_retrieval_grade(state: AgentState) -> str:
-    """Decides whether to proceed to writing or retry retrieval."""
-    if state.get("retrieved_docs_relevant", False):
-        return "writer"
-
-    # Docs not relevant — try rewriting the query once before giving up
-    if state.get("retry_count", 0) < 1:
-        return "query_rewriter"
-    return "writer"  # Proceed anyway after one retry
+    return "context_prefetch"
 
 def route_after_writer(state: AgentState) -> str:
     return "compliance_checker"
 
-def route_after_hallucination_grade(state: AgentState) -> str:
-    """Decides whether to retry generation or move to the next asset/reviewer."""
-    if not state.get("generation_grounded", True):
-        # Generation hallucinated — retry retrieval once with query rewriting
+def route_after_compliance(state: AgentState) -> str:
+    """
+    Fast-pipeline drafts go straight on to the brand review gate once checked; drafts
+    from the writer (which always runs with current_asset set) continue to the grader.
+    """
+    if state.get("mode") == "fast" and state.get("current_asset") is None:
+        return "brand_review_gate"
+    return "grader"
+
+def route_after_grade(state: AgentState) -> str:
+    """Decides whether to retry retrieval or move to the next asset/variant writer."""
+    retrieval_failed = state.get("retrieved_docs") != "" and not state.get("retrieved_docs_relevant", False)
+    if retrieval_failed or not state.get("generation_grounded", True):
+        # Irrelevant context or hallucinated draft — retry once with query rewriting
         if state.get("retry_count", 0) < 1:
             return "query_rewriter"
 
@@ -712,7 +958,7 @@ def route_after_hallucination_grade(state: AgentState) -> str:
     drafts = state.get("drafts", {})
     if len(drafts) < len(plan):
         return "retriever"  # More assets to draft
-    return "feedback_processor"
+    return "variant_writer"
 
 def route_after_feedback(state: AgentState) -> str:
     """Decides whether to regenerate drafts based on feedback or proceed to reviewer."""
@@ -751,23 +997,55 @@ def route_after_brand_review_gate(state: AgentState) -> str:
 
 # --- Graph Construction ---
 
-def create_graph():
+# Node name -> node function, registered in this order by create_graph
+_NODES = {
+    "router": router_node,
+    "planner": planner_node,
+    "context_prefetch": context_prefetch_node,
+    "retriever": retriever_node,
+    "writer": writer_node,
+    "compliance_checker": compliance_checker_node,
+    "grader": grader_node,
+    "reviewer": reviewer_node,
+    "brand_review_gate": brand_review_gate_node,
+    "publisher": publisher_node,
+    "chitchat": chitchat_node,
+    "clarification": clarification_node,
+    "query_rewriter": query_rewriter_node,
+    "feedback_processor": feedback_processor_node,
+    "fast_pipeline": fast_pipeline_node,
+    "variant_writer": variant_writer_node,
+}
+_NODE_NAMES = tuple(_NODES)
+
+def _make_checkpointer():
+    """
+    Checkpointer selected by CHECKPOINT_BACKEND. "sqlite" keeps checkpoints in a file
+    instead of the process heap (and survives restarts); falls back to MemorySaver
+    if langgraph-checkpoint-sqlite is not installed.
+    """
+    if CHECKPOINT_BACKEND == "sqlite":
+        try:
+            import sqlite3
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError:
+            logger.warning("CHECKPOINT_BACKEND=sqlite needs langgraph-checkpoint-sqlite; using MemorySaver.")
+        else:
+            # The compiled graph is shared across threads; SqliteSaver serialises access itself
+            return SqliteSaver(sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False))
+    return MemorySaver()
+
+def create_graph(hitl: bool = True):
+    """
+    Builds and compiles the campaign graph.
+    hitl=True (Streamlit) pauses at every human checkpoint. hitl=False (one-shot API)
+    runs straight through drafting and brand review in a single invoke and stops
+    before brand_review_gate, so nothing is published without a human.
+    """
     workflow = StateGraph(AgentState)
     
-    workflow.add_node("router", router_node)
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("retriever", retriever_node)
-    workflow.add_node("writer", writer_node)
-    workflow.add_node("compliance_checker", compliance_checker_node)
-    workflow.add_node("retrieval_grader", retrieval_grader)
-    workflow.add_node("hallucination_grader", hallucination_grader)
-    workflow.add_node("reviewer", reviewer_node)
-    workflow.add_node("brand_review_gate", brand_review_gate_node)
-    workflow.add_node("publisher", publisher_node)
-    workflow.add_node("chitchat", chitchat_node)
-    workflow.add_node("clarification", clarification_node)
-    workflow.add_node("query_rewriter", query_rewriter_node)
-    workflow.add_node("feedback_processor", feedback_processor_node)
+    for name, node in _NODES.items():
+        workflow.add_node(name, node)
     
     workflow.set_entry_point("router")
     
@@ -776,36 +1054,36 @@ def create_graph():
         route_after_router,
         {
             "planner": "planner",
+            "fast_pipeline": "fast_pipeline",
             "chitchat": "chitchat",
             "clarification": "clarification"
         }
     )
     
-    workflow.add_edge("planner", "retriever")
-    workflow.add_edge("retriever", "retrieval_grader")
-    
+    workflow.add_edge("planner", "context_prefetch")
+    workflow.add_edge("context_prefetch", "retriever")
+    workflow.add_edge("retriever", "writer")
+    workflow.add_edge("query_rewriter", "retriever")
+    workflow.add_edge("writer", "compliance_checker")
     workflow.add_conditional_edges(
-        "retrieval_grader",
-        route_after_retrieval_grade,
+        "compliance_checker",
+        route_after_compliance,
         {
-            "query_rewriter": "query_rewriter",
-            "writer": "writer"
+            "grader": "grader",
+            "brand_review_gate": "brand_review_gate",
         }
     )
     
-    workflow.add_edge("query_rewriter", "retriever")
-    workflow.add_edge("writer", "compliance_checker")
-    workflow.add_edge("compliance_checker", "hallucination_grader")
-    
     workflow.add_conditional_edges(
-        "hallucination_grader",
-        route_after_hallucination_grade,
+        "grader",
+        route_after_grade,
         {
             "query_rewriter": "query_rewriter",
             "retriever": "retriever",
-            "feedback_processor": "feedback_processor"
+            "variant_writer": "variant_writer"
         }
     )
+    workflow.add_edge("variant_writer", "feedback_processor")
     
     # Feedback loop edges
     workflow.add_conditional_edges(
@@ -818,6 +1096,8 @@ def create_graph():
     )
     
     workflow.add_edge("reviewer", "brand_review_gate")
+    # Fast mode still gets the deterministic compliance check before the gate
+    workflow.add_edge("fast_pipeline", "compliance_checker")
     workflow.add_conditional_edges(
         "brand_review_gate",
         route_after_brand_review_gate,
@@ -830,7 +1110,9 @@ def create_graph():
     workflow.add_edge("chitchat", END)
     workflow.add_edge("clarification", END)
     
-    memory = MemorySaver()
+    memory = _make_checkpointer()
+    if not hitl:
+        return workflow.compile(checkpointer=memory, interrupt_before=["brand_review_gate"])
     return workflow.compile(
         checkpointer=memory,
         interrupt_after=["planner"],                                          # Pause after planner → plan approval
@@ -8,13 +8,15 @@ EMBEDDING_MODEL = "embedding-001"
 INTENT_CATEGORIES = ["Factual", "Analytical", "ChitChat", "ClarificationNeeded"]
 
 # Competitor list — sourced from brand_guidelines.txt "Prohibited Terms"
-# The guardrails validator will redact any of these if they appear in generated content
+# src/guards.py redacts any of these if they appear in generated content
 COMPETITORS = [
     "Questrade", "TD Direct Investing", "RBC Direct Investing",
     "Nest Wealth", "Betterment",
 ]
 
 # Prompts
+# Static instructions come first and per-call values last, so repeated calls share
+# the longest possible prefix for Gemini's implicit context caching.
 ROUTER_PROMPT = """You are an expert router. Classify the user query into one of the following categories:
 - Factual: Queries that require specific facts or data retrieval.
 - Analytical: Queries that require analysis, comparisons, or strategic thinking.
@@ -42,12 +44,12 @@ NAMING RULES (strictly follow these):
 Campaign Goal: {goal}
 """
 
-WRITER_PROMPT = """You are a marketing copywriter. Write a {asset_type} for this goal.
+WRITER_PROMPT = """You are a marketing copywriter. Write the asset type below for the goal below.
+Reasoning Trace: (Think about the tone, key message, and call to action based on the context)
+
 Use the following context/guidelines:
 {context}
 
-Reasoning Trace: (Think about the tone, key message, and call to action based on the context)
-
 Goal: {goal}
 Asset Type: {asset_type}
 """
@@ -55,14 +57,28 @@ Asset Type: {asset_type}
 REVIEWER_PROMPT = """You are a brand compliance officer for Wealthsimple.
 Review the marketing asset below against the brand guidelines.
 
+Provide a structured review with:
+1. VERDICT: PASS or FAIL
+2. TONE CHECK: Does it match the brand voice (simple and human, honest, encouraging, proudly Canadian)?
+3. PROHIBITED TERMS: List any found (revolutionary, game-changer, guaranteed returns, risk-free, competitor names)
+4. MEASURABLE BENEFITS: Are stats or specific numbers included?
+5. SUGGESTIONS: Up to 3 specific, actionable improvements (if any)
+
+Be concise. Each section should be 1–2 sentences.
+
 Brand Guidelines:
 {guidelines}
 
 Asset Type: {asset}
 Content:
 {content}
+"""
 
-Provide a structured review with:
+REVIEWER_BATCH_PROMPT = """You are a brand compliance officer for Wealthsimple.
+Review every marketing asset below against the brand guidelines.
+
+Step 1: Call the content_quality_analyzer tool once for EVERY asset to get an objective quality report.
+Step 2: Use the tool results + brand guidelines to write one compliance verdict per asset ID with:
 1. VERDICT: PASS or FAIL
 2. TONE CHECK: Does it match the brand voice (simple and human, honest, encouraging, proudly Canadian)?
 3. PROHIBITED TERMS: List any found (revolutionary, game-changer, guaranteed returns, risk-free, competitor names)
@@ -70,22 +86,43 @@ Provide a structured review with:
 5. SUGGESTIONS: Up to 3 specific, actionable improvements (if any)
 
 Be concise. Each section should be 1–2 sentences.
+
+Brand Guidelines (excerpt):
+{guidelines}
+
+Assets (each introduced by its ID):
+{assets}
 """
 
-RETRIEVAL_GRADER_PROMPT = """You are a grader assessing relevance of a retrieved document to a user question. 
-If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. 
-It does not need to be a perfect answer; the goal is to filter out clearly irrelevant documents.
+FAST_PIPELINE_PROMPT = """You are a senior marketing strategist, copywriter and brand compliance officer at Wealthsimple.
+In one pass, plan, write and review a campaign for the goal below.
 
-Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question.
+1. PLAN: choose 3–5 marketing assets. Each name MUST follow "[Channel]: [Specific description]"
+   and mention the product AND the target audience. Match the channels stated in the goal;
+   if none are stated, choose the 3 highest-impact assets for the objective.
+2. DRAFT: write each asset in full, using the context below for facts, tone and call to action.
+3. REVIEW: critique each draft against the brand guidelines with:
+   VERDICT (PASS or FAIL), TONE CHECK, PROHIBITED TERMS (revolutionary, game-changer,
+   guaranteed returns, risk-free, competitor names), MEASURABLE BENEFITS, SUGGESTIONS (up to 3).
+   Each section should be 1–2 sentences.
 
-Retrieved Document: 
-{document}
+Brand Guidelines:
+{guidelines}
 
-User Question: {question}
+Context:
+{context}
+
+Campaign Goal: {goal}
 """
 
-HALLUCINATION_GRADER_PROMPT = """You are a grader assessing whether an LLM generation is grounded in / supported by a set of retrieved facts.
-Give a binary score 'yes' or 'no'. 'yes' means that the answer is grounded in / supported by the set of facts.
+GRADER_PROMPT = """You are a grader checking one retrieval-augmented generation step. Give two binary scores.
+
+retrieval: 'yes' if the retrieved facts contain keyword(s) or semantic meaning related to the user question.
+It does not need to be a perfect answer; the goal is to filter out clearly irrelevant documents.
+
+hallucination: 'yes' if the LLM generation is grounded in / supported by the set of facts.
+
+User Question: {question}
 
 Set of Facts:
 {documents}
@@ -93,15 +130,7 @@ Set of Facts:
 LLM Generation: {generation}
 """
 
-WRITER_FEEDBACK_PROMPT = """You are a marketing copywriter. Write a {asset_type} for this goal.
-Use the following context/guidelines:
-{context}
-
-Reasoning Trace: (Think about the tone, key message, and call to action based on the context)
-
-Goal: {goal}
-Asset Type: {asset_type}
-
+WRITER_FEEDBACK_PROMPT = WRITER_PROMPT + """
 IMPORTANT: The user reviewed the previous draft and provided this feedback. You MUST incorporate it:
 {feedback}
 """
@@ -116,11 +145,7 @@ Asset Type: {asset_type}
 """
 
 COMPLIANCE_CHECKER_PROMPT = """You are a senior marketing compliance officer at Wealthsimple.
-Review the following marketing asset for regulatory and brand compliance issues.
-
-Asset Type: {asset_type}
-Content:
-{content}
+Review the marketing asset at the end of this prompt for regulatory and brand compliance issues.
 
 Flag any of the following issues with their severity:
 
@@ -152,6 +177,10 @@ Respond ONLY with a JSON object in this exact format (no markdown, no explanatio
 
 If there are no issues, return: {{"flags": [], "passed": true}}
 The "passed" field must be false if there is at least one HIGH severity flag.
+
+Asset Type: {asset_type}
+Content:
+{content}
 """
 
 WRITER_VARIANT_PROMPT = """You are a marketing copywriter specialising in audience personalisation.
@@ -189,27 +218,105 @@ RETRIEVER_TOOL_DESCRIPTION = "Use this tool ONLY to retrieve marketing guideline
 
 # LLM Provider Factory
 import os
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_llm(temperature: float = 0):
+# Optional exact-match LLM response cache (LangChain SQLiteCache), keyed by prompt + model params.
+# Set LLM_CACHE_PATH (e.g. ".langchain.db") to make repeated runs with identical inputs free.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+
+if LLM_CACHE_PATH:
+    from langchain_community.cache import SQLiteCache
+    from langchain_core.globals import set_llm_cache
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+# Upper bound on LLM requests a single node fans out concurrently (e.g. per-asset reviews)
+MAX_PARALLEL_LLM_CALLS = int(os.getenv("MAX_PARALLEL_LLM_CALLS", "4"))
+
+# Cosine-similarity threshold for reusing retrieved context across near-duplicate queries (0 disables)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+# Seconds before the cached brand guidelines excerpt is re-fetched from the vector store (0 = until next ingest)
+GUIDELINES_TTL_SECONDS = float(os.getenv("GUIDELINES_TTL_SECONDS", "3600"))
+
+# Where LangGraph checkpoints live: "memory" (default, process heap) or "sqlite" (file at
+# CHECKPOINT_PATH; needs langgraph-checkpoint-sqlite) to keep long sessions off the heap
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "checkpoints.sqlite")
+
+# Client-side rate limit shared by every LLM client, in requests/second (0 disables).
+# Requests over the limit wait for a token instead of triggering provider 429 cascades.
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "0"))
+
+_rate_limiter = None
+if LLM_REQUESTS_PER_SECOND > 0:
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+    _rate_limiter = InMemoryRateLimiter(
+        requests_per_second=LLM_REQUESTS_PER_SECOND,
+        check_every_n_seconds=0.1,
+        max_bucket_size=MAX_PARALLEL_LLM_CALLS,
+    )
+
+def _llm_spec(temperature: float, model: Optional[str] = None, api_key: Optional[str] = None) -> tuple:
+    """
+    Resolves (provider, model, temperature, api_key) from the environment for the LLM client caches.
+    An explicit api_key (a Google key supplied per request) overrides GOOGLE_API_KEY; it is
+    ignored for Groq, which always uses GROQ_API_KEY.
+    """
+    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    if provider == "groq":
+        model = model or os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+        return "groq", model, temperature, os.getenv("GROQ_API_KEY")
+    # Default: Google Gemini
+    return "gemini", model or DEFAULT_MODEL, temperature, api_key or os.getenv("GOOGLE_API_KEY")
+
+
+# Smaller, cheaper models for small-talk replies, per provider (CHITCHAT_MODEL overrides)
+CHITCHAT_MODELS = {"gemini": "gemini-2.5-flash-lite", "groq": "llama-3.1-8b-instant"}
+
+
+def chitchat_model() -> str:
+    """Model used by the ChitChat node for the active LLM_PROVIDER."""
+    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    return os.getenv("CHITCHAT_MODEL") or CHITCHAT_MODELS.get(provider, CHITCHAT_MODELS["gemini"])
+
+
+def get_llm(temperature: float = 0, model: Optional[str] = None, api_key: Optional[str] = None):
     """
     Returns an LLM instance based on LLM_PROVIDER env var.
     Set LLM_PROVIDER=groq in .env to use Groq (Llama 3.3 70B) — much higher free-tier rate limits.
-    Defaults to Google Gemini if not set.
+    Defaults to Google Gemini if not set. Pass model to override the provider's default model,
+    and api_key to use a caller-supplied Google key instead of GOOGLE_API_KEY.
+    """
+    return _build_llm(*_llm_spec(temperature, model, api_key))
+
+
+def get_structured_llm(schema, temperature: float = 0, model: Optional[str] = None, api_key: Optional[str] = None):
+    """Returns the shared LLM wrapped with with_structured_output(schema), built once per schema."""
+    return _build_structured_llm(*_llm_spec(temperature, model, api_key), schema)
+
+
+@lru_cache(maxsize=16)
+def _build_llm(provider: str, model: str, temperature: float, api_key: Optional[str]):
+    """
+    Constructs the chat model client. Cached so every node shares one instance — and
+    its pooled HTTP connections (Groq) or multiplexed HTTP/2 gRPC channel (Gemini) —
+    instead of paying client setup and TLS handshakes per call.
+    The API key is part of the cache key so a key entered in the UI takes effect.
     """
-    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
     if provider == "groq":
         from langchain_groq import ChatGroq
-        return ChatGroq(
-            model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
-            api_key=os.getenv("GROQ_API_KEY"),
-            temperature=temperature,
-        )
-    # Default: Google Gemini
+        return ChatGroq(model=model, api_key=api_key, temperature=temperature, rate_limiter=_rate_limiter)
     from langchain_google_genai import ChatGoogleGenerativeAI
-    return ChatGoogleGenerativeAI(model=DEFAULT_MODEL, temperature=temperature)
+    return ChatGoogleGenerativeAI(model=model, google_api_key=api_key, temperature=temperature, rate_limiter=_rate_limiter)
+
+
+@lru_cache(maxsize=32)
+def _build_structured_llm(provider: str, model: str, temperature: float, api_key: Optional[str], schema):
+    return _build_llm(provider, model, temperature, api_key).with_structured_output(schema)
 
 
 # Langfuse Configuration
@@ -2,12 +2,18 @@ import os
 import json
 import logging
 import pickle
+import threading
 from typing import Optional, Tuple
 
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaInMemoryUpload
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
 logger = logging.getLogger("google_utils")
 
@@ -19,8 +25,72 @@ SCOPES = [
 
 TOKEN_PATH = 'token.pickle'
 
+# Attempts per API request. Only 429/5xx responses are retried: the create/insert calls
+# are not idempotent, so a timed-out request the server may already have applied is not
+# sent again. Waits back off exponentially with jitter (about 1s, 2s, 4s, ... up to 30s),
+# or follow the server's Retry-After header when it sends one.
+API_ATTEMPTS = 6
+RETRY_AFTER_MAX = 60
+
+# Socket timeout (seconds) per API request; httplib2 otherwise waits indefinitely
+API_TIMEOUT = 60
+
+# Credentials are loaded once per process and refreshed in place when they expire.
+_creds = None
+_creds_lock = threading.Lock()
+
+# Service clients are cached per thread: googleapiclient's httplib2 transport is not
+# thread-safe, and the publisher calls the APIs from a thread pool.
+_local = threading.local()
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, HttpError) and (exc.resp.status == 429 or exc.resp.status >= 500)
+
+
+_backoff = wait_exponential_jitter(initial=1, max=30)
+
+
+def _retry_wait(retry_state) -> float:
+    """Honors a numeric Retry-After header, otherwise backs off exponentially."""
+    retry_after = retry_state.outcome.exception().resp.get("retry-after", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), RETRY_AFTER_MAX)
+    return _backoff(retry_state)
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_retry_wait,
+    stop=stop_after_attempt(API_ATTEMPTS),
+    reraise=True,
+)
+def _execute(request):
+    """Executes an API request, retrying it on 429/5xx responses only."""
+    return request.execute()
+
 
 def get_google_credentials():
+    """
+    Returns cached Google credentials, refreshing them in place when expired.
+    Only the first call (or a failed refresh) goes through the full loading flow.
+    """
+    global _creds
+    with _creds_lock:
+        if _creds is not None and not _creds.expired:
+            return _creds
+        if _creds is not None and getattr(_creds, "refresh_token", None):
+            try:
+                _creds.refresh(Request())
+                _save_token(_creds)
+                return _creds
+            except Exception as e:
+                logger.warning(f"Token refresh failed: {e}. Re-authenticating...")
+        _creds = _load_google_credentials()
+        return _creds
+
+
+def _load_google_credentials():
     """
     Load Google credentials from available sources (priority order):
       1. Saved token.pickle (reuse + refresh)
@@ -108,11 +178,25 @@ def _save_token(creds):
 
 
 def get_google_service(service_name: str, version: str):
-    """Build and return a Google API service client, or None if credentials unavailable."""
+    """
+    Return a Google API service client, or None if credentials unavailable.
+    Built once per thread and reused while the credentials object is unchanged.
+    """
     creds = get_google_credentials()
     if not creds:
         return None
-    return build(service_name, version, credentials=creds)
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    cached = services.get((service_name, version))
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+    # Each client owns a persistent httplib2 connection, so a thread's requests reuse one TLS session
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=API_TIMEOUT))
+    # Discovery docs ship with google-api-python-client: no HTTP fetch and no discovery-cache probing
+    service = build(service_name, version, http=http, cache_discovery=False, static_discovery=True)
+    services[(service_name, version)] = (creds, service)
+    return service
 
 
 def publish_draft_to_gdoc(title: str, content: str) -> Tuple[str, str]:
@@ -177,9 +261,9 @@ def create_doc(title: str, content: str, use_mcp: bool = True) -> Tuple[str, str
         try:
             from src.mcp_client import get_gdrive_client
             mcp_client = get_gdrive_client()
+            # Server is started once and kept alive for later docs (stopped at exit)
             if mcp_client and mcp_client.start_server():
                 result = mcp_client.create_google_doc(title, content)
-                mcp_client.stop_server()
                 if result:
                     logger.info(f"Created doc via MCP: {result[1]}")
                     return result
@@ -189,26 +273,49 @@ def create_doc(title: str, content: str, use_mcp: bool = True) -> Tuple[str, str
         except Exception as e:
             logger.warning(f"MCP failed: {e}, falling back to Google API")
 
-    service = get_google_service('docs', 'v1')
-    if not service:
+    drive = get_google_service('drive', 'v3')
+    if not drive:
         mock_id = f"mock_{title[:20].replace(' ', '_')}"
         mock_url = f"https://docs.google.com/document/d/{mock_id}"
         logger.warning(f"No credentials — returning mock Doc URL: {mock_url}")
         return mock_id, mock_url
 
-    doc = service.documents().create(body={'title': title}).execute()
-    doc_id = doc.get('documentId')
-
-    service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': [{'insertText': {'location': {'index': 1}, 'text': content}}]}
-    ).execute()
+    try:
+        doc_id = _upload_as_doc(drive, title, content)
+    except Exception as e:
+        # e.g. Drive API not enabled for the project — use the two-call Docs API path
+        logger.warning(f"Drive upload failed ({e}), creating the doc via the Docs API")
+        doc_id = _create_doc_via_docs_api(title, content)
 
     doc_url = f"https://docs.google.com/document/d/{doc_id}"
     logger.info(f"Created Google Doc: {doc_url}")
     return doc_id, doc_url
 
 
+def _upload_as_doc(drive, title: str, content: str) -> str:
+    """Creates a Google Doc with its content in one Drive request (plain text converted on upload)."""
+    media = MediaInMemoryUpload(content.encode("utf-8"), mimetype="text/plain", resumable=False)
+    doc = _execute(drive.files().create(
+        body={'name': title, 'mimeType': 'application/vnd.google-apps.document'},
+        media_body=media,
+        fields='id',
+    ))
+    return doc['id']
+
+
+def _create_doc_via_docs_api(title: str, content: str) -> str:
+    """Creates an empty Google Doc, then inserts the content (two requests)."""
+    service = get_google_service('docs', 'v1')
+    doc = _execute(service.documents().create(body={'title': title}))
+    doc_id = doc.get('documentId')
+
+    _execute(service.documents().batchUpdate(
+        documentId=doc_id,
+        body={'requests': [{'insertText': {'location': {'index': 1}, 'text': content}}]}
+    ))
+    return doc_id
+
+
 def add_calendar_event(summary: str, start_time: str, description: Optional[str] = None) -> str:
     """Add a publishing event to Google Calendar. Returns event ID or mock."""
     service = get_google_service('calendar', 'v3')
@@ -221,5 +328,5 @@ def add_calendar_event(summary: str, start_time: str, description: Optional[str]
         'start': {'dateTime': start_time, 'timeZone': 'UTC'},
         'end': {'dateTime': start_time, 'timeZone': 'UTC'},
     }
-    event = service.events().insert(calendarId='primary', body=event).execute()
+    event = _execute(service.events().insert(calendarId='primary', body=event))
     return event.get('id')
@@ -0,0 +1,23 @@
+# src/guards.py
+# Competitor redaction for generated drafts. A single precompiled, case-insensitive
+# pattern finds every competitor name in one pass over the text.
+import re
+from typing import Iterable
+
+from src.config import COMPETITORS
+
+REDACTED = "[REDACTED]"
+
+
+def _competitor_pattern(competitors: Iterable[str]) -> re.Pattern:
+    # Longest names first so "TD Direct Investing" wins over any shorter overlap
+    names = sorted({c for c in competitors if c}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, names)) + r")\b", re.IGNORECASE)
+
+
+_COMPETITOR_RE = _competitor_pattern(COMPETITORS)
+
+
+def redact_competitors(text: str) -> str:
+    """Replaces every competitor name (any casing) with [REDACTED]."""
+    return _COMPETITOR_RE.sub(REDACTED, text)
@@ -6,16 +6,32 @@ specifically for Google Drive/Docs operations.
 """
 
 import subprocess
-import json
+import orjson
 import logging
 import os
+import atexit
+import itertools
+import threading
+from concurrent.futures import Future
 from typing import Optional, Dict, Any, List
 
 logger = logging.getLogger("MCPClient")
 
+PIPE_BUFFER_SIZE = 1 << 20
+
 class MCPClient:
-    """Client for interacting with MCP servers."""
-    
+    """
+    Client for interacting with MCP servers.
+
+    Requests are multiplexed over the server's stdin/stdout: each call gets a unique
+    JSON-RPC id and waits on its own Future, while a background reader thread routes
+    responses back by id. Concurrent callers therefore share one server process
+    instead of serialising on a blocking readline.
+    """
+
+    # Seconds to wait for a tool response before giving up
+    CALL_TIMEOUT = 60
+
     def __init__(self, server_config: Dict[str, Any]):
         """
         Initialize MCP client with server configuration.
@@ -28,9 +44,22 @@ class MCPClient:
         self.env = server_config.get("env", {})
         self.process: Optional[subprocess.Popen] = None
         self.is_running = False
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self._resolved_env: Optional[Dict[str, str]] = None
         
     def _prepare_env(self) -> Dict[str, str]:
-        """Prepare environment variables for the MCP server."""
+        """
+        Prepare environment variables for the MCP server.
+        Resolved on first start and reused for restarts.
+        """
+        if self._resolved_env is not None:
+            return self._resolved_env
+
         env = os.environ.copy()
         
         # Resolve environment variable placeholders
@@ -42,35 +71,48 @@ class MCPClient:
             else:
                 env[key] = value
         
+        self._resolved_env = env
         return env
     
     def start_server(self) -> bool:
         """
         Start the MCP server process.
+
+        Safe to call before every use: returns immediately while the server is
+        alive, and respawns it if the process has exited.
         
         Returns:
             True if server started successfully, False otherwise
         """
-        if self.is_running:
-            logger.info("MCP server already running")
-            return True
-            
+        with self._start_lock:
+            if self.is_running and self.process and self.process.poll() is None:
+                return True
+            return self._spawn()
+
+    def _spawn(self) -> bool:
+        """Launch the server subprocess and its reader thread."""
         try:
             env = self._prepare_env()
             
             logger.info(f"Starting MCP server: {self.command} {' '.join(self.args)}")
             
+            # Binary pipes with a 1 MiB buffer: orjson reads and writes bytes directly, and
+            # large document responses are read in few syscalls. stderr is discarded, since
+            # nothing reads it and a full pipe would block the long-lived server.
             self.process = subprocess.Popen(
                 [self.command] + self.args,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 env=env,
-                text=True,
-                bufsize=1
+                bufsize=PIPE_BUFFER_SIZE,
             )
             
             self.is_running = True
+            self._reader = threading.Thread(
+                target=self._read_responses, args=(self.process,), name="mcp-reader", daemon=True
+            )
+            self._reader.start()
             logger.info("MCP server started successfully")
             return True
             
@@ -78,6 +120,27 @@ class MCPClient:
             logger.error(f"Failed to start MCP server: {e}")
             return False
     
+    def _read_responses(self, process: subprocess.Popen):
+        """Reader thread: resolves the pending Future matching each response id."""
+        for line in process.stdout:
+            try:
+                response = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # log output or partial line, not a JSON-RPC message
+            if not isinstance(response, dict):
+                continue
+            with self._pending_lock:
+                future = self._pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+            # Messages without a matching id (notifications) are ignored
+
+        # Server exited — fail whatever is still waiting
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ConnectionError("MCP server closed its output"))
+
     def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Call a tool on the MCP server.
@@ -93,6 +156,11 @@ class MCPClient:
             logger.error("MCP server not running")
             return None
         
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+
         try:
             # Prepare JSON-RPC request
             request = {
@@ -102,17 +170,17 @@ class MCPClient:
                     "name": tool_name,
                     "arguments": arguments
                 },
-                "id": 1
+                "id": request_id
             }
             
-            # Send request
-            request_str = json.dumps(request) + "\n"
-            self.process.stdin.write(request_str)
-            self.process.stdin.flush()
+            # Send request — one writer at a time so lines don't interleave
+            request_bytes = orjson.dumps(request) + b"\n"
+            with self._write_lock:
+                self.process.stdin.write(request_bytes)
+                self.process.stdin.flush()
             
-            # Read response
-            response_str = self.process.stdout.readline()
-            response = json.loads(response_str)
+            # Wait for the reader thread to route our response back
+            response = future.result(timeout=self.CALL_TIMEOUT)
             
             if "error" in response:
                 logger.error(f"MCP tool error: {response['error']}")
@@ -123,6 +191,9 @@ class MCPClient:
         except Exception as e:
             logger.error(f"Error calling MCP tool: {e}")
             return None
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
     
     def create_google_doc(self, title: str, content: str) -> Optional[tuple]:
         """
@@ -205,27 +276,40 @@ def load_mcp_config(config_path: str = "mcp_config.json") -> Optional[Dict[str,
         Configuration dict or None if failed
     """
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        with open(config_path, 'rb') as f:
+            config = orjson.loads(f.read())
         return config
     except Exception as e:
         logger.error(f"Failed to load MCP config: {e}")
         return None
 
 
+_gdrive_client: Optional[MCPClient] = None
+_gdrive_client_lock = threading.Lock()
+
+
 def get_gdrive_client() -> Optional[MCPClient]:
     """
     Get configured MCP client for Google Drive.
+
+    The client is a process-wide singleton so its server subprocess is spawned
+    once and reused across documents; it is stopped at interpreter exit.
     
     Returns:
         MCPClient instance or None if configuration failed
     """
-    config = load_mcp_config()
-    if not config or "gdrive" not in config.get("mcpServers", {}):
-        logger.error("Google Drive MCP server not configured")
-        return None
-    
-    server_config = config["mcpServers"]["gdrive"]
-    client = MCPClient(server_config)
-    
-    return client
+    global _gdrive_client
+    with _gdrive_client_lock:
+        if _gdrive_client is not None:
+            return _gdrive_client
+
+        config = load_mcp_config()
+        if not config or "gdrive" not in config.get("mcpServers", {}):
+            logger.error("Google Drive MCP server not configured")
+            return None
+
+        server_config = config["mcpServers"]["gdrive"]
+        _gdrive_client = MCPClient(server_config)
+        atexit.register(_gdrive_client.stop_server)
+
+        return _gdrive_client
@@ -1,3 +1,3 @@
-from .pipeline import ingest_docs, retrieve_context
+from .pipeline import ingest_docs, retrieve_context, aretrieve_context, retrieve_many, get_brand_guidelines
 
-__all__ = ["ingest_docs", "retrieve_context"]
+__all__ = ["ingest_docs", "retrieve_context", "aretrieve_context", "retrieve_many", "get_brand_guidelines"]
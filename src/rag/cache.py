@@ -0,0 +1,67 @@
+import threading
+import numpy as np
+
+def _unit(vector) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+class SemanticCache:
+    """
+    Maps query embeddings to retrieved context.
+    A lookup returns the context cached for the most similar earlier query when their
+    cosine similarity is at least `threshold`. Holds at most `max_entries`; the least
+    recently used entry is replaced first.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._matrix = None        # (max_entries, D) unit query vectors; first len(self) rows in use
+        self._values = []          # cached context per row
+        self._last_used = []       # logical clock per row, for LRU eviction
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def get(self, vector):
+        """Returns the cached context for a near-duplicate query, or None."""
+        query = _unit(vector)
+        with self._lock:
+            if not self._values:
+                return None
+            similarities = self._matrix[:len(self._values)] @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            self._touch(best)
+            return self._values[best]
+
+    def put(self, vector, value):
+        query = _unit(vector)
+        with self._lock:
+            if len(self._values) >= self.max_entries:
+                row = int(np.argmin(self._last_used))
+                self._matrix[row] = query
+                self._values[row] = value
+            else:
+                if self._matrix is None:
+                    # Allocated once at full size so inserts don't reallocate the matrix
+                    self._matrix = np.empty((self.max_entries, query.shape[0]), dtype=np.float32)
+                row = len(self._values)
+                self._matrix[row] = query
+                self._values.append(value)
+                self._last_used.append(0)
+            self._touch(row)
+
+    def clear(self):
+        with self._lock:
+            self._matrix = None
+            self._values = []
+            self._last_used = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def _touch(self, row: int):
+        self._clock += 1
+        self._last_used[row] = self._clock
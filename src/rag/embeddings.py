@@ -1,7 +1,28 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+from functools import lru_cache
 
+# Chunks per forward pass; larger batches keep a GPU busy during ingestion
+ENCODE_BATCH_SIZE = 64
+
+def _default_device() -> str:
+    """Picks the fastest available torch device for the sentence-transformer."""
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+@lru_cache(maxsize=None)
 def get_embedding_function(model_name: str = "all-MiniLM-L6-v2"):
     """
     Returns the embedding function.
+    Cached per model name so the sentence-transformer weights load once per process.
+    Runs on GPU when one is available and encodes chunks in batches of ENCODE_BATCH_SIZE.
     """
-    return HuggingFaceEmbeddings(model_name=model_name)
+    # Imported here so importing src.rag doesn't pull in sentence-transformers/torch
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"device": _default_device()},
+        encode_kwargs={"batch_size": ENCODE_BATCH_SIZE, "normalize_embeddings": True},
+    )
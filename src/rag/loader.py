@@ -1,13 +1,33 @@
 import os
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from langchain_core.documents import Document
 
-def load_documents(data_dir: str):
+# File reads are IO-bound and release the GIL, so oversubscribe the cores
+MAX_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def iter_documents(data_dir: str):
     """
-    Loads text files from the specified directory.
+    Yields one Document per text file under data_dir (recursively), with its path as "source".
+    Files are read concurrently in windows of MAX_READ_WORKERS, so only one window of
+    file contents is held in memory at a time.
     """
-    if not os.path.exists(data_dir):
+    root = Path(data_dir)
+    if not root.exists():
         raise FileNotFoundError(f"Data directory '{data_dir}' not found.")
 
-    loader = DirectoryLoader(data_dir, glob="**/*.txt", loader_cls=TextLoader)
-    documents = loader.load()
-    return documents
+    paths = sorted(root.rglob("*.txt"))
+    if not paths:
+        return
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(paths))) as executor:
+        for start in range(0, len(paths), MAX_READ_WORKERS):
+            window = paths[start:start + MAX_READ_WORKERS]
+            texts = executor.map(lambda p: p.read_text(encoding="utf-8", errors="ignore"), window)
+            for path, text in zip(window, texts):
+                yield Document(page_content=text, metadata={"source": str(path)})
+
+def load_documents(data_dir: str):
+    """
+    Loads text files from the specified directory (recursively).
+    """
+    return list(iter_documents(data_dir))
@@ -1,42 +1,202 @@
-from .loader import load_documents
-from .splitter import split_documents
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from itertools import chain, count
+from typing import List, Optional
+from .loader import iter_documents
+from .splitter import iter_split
 from .embeddings import get_embedding_function
-from .vector_store import create_vector_store, get_retriever
+from .vector_store import create_vector_store, get_vector_store
+from .cache import SemanticCache
+from src.config import SEMANTIC_CACHE_THRESHOLD, GUIDELINES_TTL_SECONDS
 
 # Directory where the vector store will be persisted
 PERSIST_DIRECTORY = "./chroma_db"
 
+# Query used to pull the brand voice / prohibited-terms excerpt for reviews
+BRAND_GUIDELINES_QUERY = "Brand voice, tone guidelines and prohibited terms"
+NO_KNOWLEDGE_BASE = "No knowledge base found. Please run ingestion."
+
+# Brand guidelines excerpt shared by every review: (text, monotonic fetch time)
+_guidelines = (None, 0.0)
+
+# Semantic caches of retrieved context per k; near-duplicate queries skip the vector search
+_semantic_caches = {}
+
+def _semantic_cache(k: int):
+    if not SEMANTIC_CACHE_THRESHOLD:
+        return None
+    cache = _semantic_caches.get(k)
+    if cache is None:
+        cache = _semantic_caches.setdefault(k, SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD))
+    return cache
+
+# Modification time of the persisted store when the caches were last filled. The store
+# may be re-ingested by another process (the Streamlit app ingests, the API only reads),
+# so every lookup compares it against the files on disk before trusting a cached result.
+_store_version = None
+
+def _persisted_version() -> Optional[float]:
+    """Latest mtime among the persist directory's entries, or None if no store exists."""
+    try:
+        with os.scandir(PERSIST_DIRECTORY) as entries:
+            return max((entry.stat().st_mtime for entry in entries), default=0.0)
+    except FileNotFoundError:
+        return None
+
+def _check_store_version() -> Optional[float]:
+    """
+    Drops cached context and guidelines if the store changed since they were cached.
+    Returns the current version (None when there is no knowledge base).
+    """
+    global _store_version, _guidelines
+    version = _persisted_version()
+    if version != _store_version:
+        _store_version = version
+        _cached_retrieve.cache_clear()
+        _semantic_caches.clear()
+        _guidelines = (None, 0.0)
+    return version
+
+# Retrievals currently running, keyed by (query, k); concurrent callers share one result
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _single_flight(key, fn):
+    """
+    Runs fn() once for concurrent callers with the same key; the others wait on its Future.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight[key] = future
+    if not is_owner:
+        return future.result()
+
+    try:
+        result = fn()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
 def ingest_docs(data_dir: str = "./data"):
     """
     Ingests text files from the data directory into a local Chroma vector store.
+    Loading, splitting and persisting are chained generators, so a file's chunks are
+    embedded and stored before later files are read.
     """
-    # 1. Load documents
-    documents = load_documents(data_dir)
-    
-    if not documents:
+    # 1. Load documents (lazily)
+    documents = iter_documents(data_dir)
+    first = next(documents, None)
+
+    if first is None:
         print("No documents found to ingest.")
         return
 
-    # 2. Split documents
-    docs = split_documents(documents)
+    # 2. Split documents; zip advances the counter once per chunk consumed
+    chunk_count = count()
+    docs = (chunk for chunk, _ in zip(iter_split(chain([first], documents)), chunk_count))
 
     # 3. Initialize Embeddings
     embedding_function = get_embedding_function()
 
     # 4. Create and persist vector store
     create_vector_store(docs, embedding_function, PERSIST_DIRECTORY)
-    print(f"Ingested {len(docs)} document chunks into {PERSIST_DIRECTORY}.")
+    global _guidelines
+    _cached_retrieve.cache_clear()
+    _semantic_caches.clear()
+    _guidelines = (None, 0.0)
+    print(f"Ingested {next(chunk_count)} document chunks into {PERSIST_DIRECTORY}.")
 
 def retrieve_context(query: str, k: int = 3) -> str:
     """
     Retrieves relevant context from the vector store based on the query.
+    Results are cached per (query, k) until the persisted store changes, and
+    concurrent cache misses for the same query share a single vector search.
+    A missing knowledge base is never cached, so a later ingest is picked up.
     """
+    if _check_store_version() is None:
+        return NO_KNOWLEDGE_BASE
+    return _cached_retrieve(query, k)
+
+@lru_cache(maxsize=256)
+def _cached_retrieve(query: str, k: int) -> str:
+    return _single_flight((query, k), lambda: _retrieve(query, k))
+
+def _retrieve(query: str, k: int, use_cache: bool = True) -> str:
     embedding_function = get_embedding_function()
-    retriever = get_retriever(PERSIST_DIRECTORY, embedding_function, k)
-    
-    if retriever is None:
-        return "No knowledge base found. Please run ingestion."
-
-    docs = retriever.invoke(query)
-    
-    return "\n\n".join([doc.page_content for doc in docs])
+    db = get_vector_store(PERSIST_DIRECTORY, embedding_function)
+
+    if db is None:
+        return NO_KNOWLEDGE_BASE
+
+    return _search_by_vector(db, embedding_function.embed_query(query), k, use_cache)
+
+def _search_by_vector(db, vector, k: int, use_cache: bool = True) -> str:
+    """
+    Top-k context for a query embedding, served from the semantic cache when an
+    earlier query was close enough (unless use_cache is False).
+    """
+    cache = _semantic_cache(k) if use_cache else None
+    if cache is not None:
+        cached = cache.get(vector)
+        if cached is not None:
+            return cached
+
+    context = "\n\n".join(doc.page_content for doc in db.similarity_search_by_vector(vector, k=k))
+    if cache is not None:
+        cache.put(vector, context)
+    return context
+
+def retrieve_many(queries: List[str], k: int = 3) -> List[str]:
+    """
+    Retrieves context for several queries at once: one batched embedding pass over all
+    queries, then a vector search per query embedding. Returns [] if no knowledge base exists.
+    """
+    if not queries or _check_store_version() is None:
+        return []
+
+    embedding_function = get_embedding_function()
+    db = get_vector_store(PERSIST_DIRECTORY, embedding_function)
+    if db is None:
+        return []
+
+    vectors = embedding_function.embed_documents(list(queries))
+    return [_search_by_vector(db, vector, k) for vector in vectors]
+
+def get_brand_guidelines() -> str:
+    """
+    Returns the brand guidelines excerpt, or "" if no knowledge base has been ingested.
+    Fetched once and shared by every review until the store changes, or until
+    GUIDELINES_TTL_SECONDS pass.
+    """
+    global _guidelines
+    _check_store_version()
+    text, fetched_at = _guidelines
+    expired = GUIDELINES_TTL_SECONDS > 0 and time.monotonic() - fetched_at > GUIDELINES_TTL_SECONDS
+    if text is None or expired:
+        # A refresh must see the current store, so it bypasses the semantic cache
+        context = _single_flight(
+            ("guidelines",), lambda: _retrieve(BRAND_GUIDELINES_QUERY, 3, use_cache=False)
+        )
+        text = "" if context == NO_KNOWLEDGE_BASE else context
+        _guidelines = (text, time.monotonic())
+    return text
+
+async def aretrieve_context(query: str, k: int = 3) -> str:
+    """
+    Async variant of retrieve_context for callers running on an event loop.
+    Runs the cached lookup on a worker thread, so async callers share the same
+    exact-match, single-flight and semantic caches as sync ones.
+    """
+    return await asyncio.to_thread(retrieve_context, query, k)
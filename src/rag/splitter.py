@@ -1,8 +1,21 @@
+from functools import lru_cache
 from langchain_text_splitters import CharacterTextSplitter
 
+@lru_cache(maxsize=None)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> CharacterTextSplitter:
+    """Builds the splitter once per (chunk_size, chunk_overlap) pair."""
+    return CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
 def split_documents(documents, chunk_size: int = 1000, chunk_overlap: int = 200):
     """
     Splits documents into chunks.
     """
-    text_splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    return text_splitter.split_documents(documents)
+    return _get_splitter(chunk_size, chunk_overlap).split_documents(documents)
+
+def iter_split(documents, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """
+    Lazily splits an iterable of documents, yielding each document's chunks in turn.
+    """
+    splitter = _get_splitter(chunk_size, chunk_overlap)
+    for document in documents:
+        yield from splitter.split_documents([document])
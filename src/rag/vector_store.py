@@ -1,22 +1,94 @@
 import os
-from langchain_chroma import Chroma
+import re
+import hashlib
+from itertools import islice
 
-def create_vector_store(docs, embedding_function, persist_directory: str):
+# One in-process Chroma client per persist directory, and the vector store handles on top of it
+_clients = {}
+_vector_stores = {}
+
+# Chunks embedded per embed_documents call (and per Chroma upsert) during ingestion
+EMBED_BATCH_SIZE = 256
+
+# HNSW index settings, applied when the collection is first created (existing stores keep theirs).
+# A denser build (ef_construction) buys back the recall a narrower search beam (ef_search) gives up;
+# the beam only needs to cover the handful of chunks a query asks for.
+HNSW_CONFIG = {"hnsw": {"ef_construction": 200, "ef_search": 64, "max_neighbors": 16}}
+
+# Shape of a chunk_id; anything else in the collection predates content-addressed IDs
+_CHUNK_ID_RE = re.compile(r"[0-9a-f]{64}")
+
+def chunk_id(doc) -> str:
+    """
+    Content-addressed ID for a chunk: sha256 of its source and text.
+    """
+    source = doc.metadata.get("source", "")
+    return hashlib.sha256(f"{source}\0{doc.page_content}".encode("utf-8")).hexdigest()
+
+def get_client(persist_directory: str):
     """
-    Creates and persists a Chroma vector store.
+    Returns the process-wide persistent Chroma client for persist_directory.
     """
-    return Chroma.from_documents(
-        documents=docs,
-        embedding=embedding_function,
-        persist_directory=persist_directory
+    client = _clients.get(persist_directory)
+    if client is None:
+        import chromadb  # deferred: chromadb is slow to import and only needed once the KB is used
+        client = chromadb.PersistentClient(path=persist_directory)
+        _clients[persist_directory] = client
+    return client
+
+def create_vector_store(docs, embedding_function, persist_directory: str, batch_size: int = EMBED_BATCH_SIZE):
+    """
+    Creates or updates the persisted Chroma vector store.
+    Chunks are keyed by content hash, so re-ingesting skips chunks that are already
+    stored (no re-embedding, no duplicates). Chunks left by older ingests under random
+    UUIDs can never match a hash, so they are deleted first and re-added under their
+    hash. docs may be any iterable, including a generator: it is consumed and persisted
+    batch by batch, so only one batch of chunks is held in memory at a time.
+    """
+    from langchain_chroma import Chroma
+    db = Chroma(
+        client=get_client(persist_directory),
+        embedding_function=embedding_function,
+        collection_configuration=HNSW_CONFIG,
     )
 
-def get_retriever(persist_directory: str, embedding_function, k: int = 3):
+    legacy_ids = [doc_id for doc_id in db.get(include=[])["ids"] if not _CHUNK_ID_RE.fullmatch(doc_id)]
+    if legacy_ids:
+        db.delete(ids=legacy_ids)
+
+    seen = set()
+    docs = iter(docs)
+    while batch := list(islice(docs, batch_size)):
+        unique_docs = {}
+        for doc in batch:
+            doc_id = chunk_id(doc)
+            if doc_id not in seen:
+                seen.add(doc_id)
+                unique_docs[doc_id] = doc
+        if not unique_docs:
+            continue
+        existing = set(db.get(ids=list(unique_docs), include=[])["ids"])
+        new_ids = [doc_id for doc_id in unique_docs if doc_id not in existing]
+        if new_ids:
+            db.add_documents([unique_docs[doc_id] for doc_id in new_ids], ids=new_ids)
+
+    _vector_stores[persist_directory] = db
+    return db
+
+def get_vector_store(persist_directory: str, embedding_function):
     """
-    Returns a retriever from an existing Chroma vector store.
+    Returns the Chroma vector store for persist_directory, opening it on first use.
     """
     if not os.path.exists(persist_directory):
         return None
-        
-    db = Chroma(persist_directory=persist_directory, embedding_function=embedding_function)
-    return db.as_retriever(search_kwargs={"k": k})
+
+    db = _vector_stores.get(persist_directory)
+    if db is None:
+        from langchain_chroma import Chroma
+        db = Chroma(
+            client=get_client(persist_directory),
+            embedding_function=embedding_function,
+            collection_configuration=HNSW_CONFIG,
+        )
+        _vector_stores[persist_directory] = db
+    return db
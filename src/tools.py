@@ -1,5 +1,6 @@
 # src/tools.py
 import re
+import asyncio
 import json
 from typing import Type, List, Dict, Any
 from pydantic import BaseModel, Field
@@ -30,7 +31,7 @@ class RetrieverTool(BaseTool):
             return f"Error retrieving context: {str(e)}"
 
     async def _arun(self, query: str) -> str:
-        return self._run(query)
+        return await asyncio.to_thread(self._run, query)
 
 
 # ─── Content Quality Analyzer Tool (Function Calling) ────────────────────────
@@ -192,6 +193,10 @@ class GoogleDocTool(BaseTool):
         except Exception as e:
             return f"Error creating Google Doc: {str(e)}"
 
+    async def _arun(self, title: str, content: str) -> str:
+        # googleapiclient is sync-only; run it on a worker thread so concurrent tool calls overlap
+        return await asyncio.to_thread(self._run, title, content)
+
 class GoogleCalendarInput(BaseModel):
     summary: str = Field(description="Event title.")
     start_time: str = Field(description="Start time in ISO format (e.g., 2025-09-01T09:00:00Z).")
@@ -209,6 +214,9 @@ class GoogleCalendarTool(BaseTool):
         except Exception as e:
             return f"Error scheduling event: {str(e)}"
 
+    async def _arun(self, summary: str, start_time: str, description: str = "") -> str:
+        return await asyncio.to_thread(self._run, summary, start_time, description)
+
 
 # ─── Compliance Checker Tool ──────────────────────────────────────────────────
 
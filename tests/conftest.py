@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import src.tools as _tools
+
+# Recorded helper responses, one JSON file per call, named by the hash of the call
+MOCK_CACHE = Path(__file__).parent / "fixtures" / "mock_cache"
+
+# Helpers in src.tools whose responses are recorded and replayed
+RECORDED_HELPERS = ("create_doc", "add_calendar_event")
+
+
+def _cache_key(fn_name, args) -> str:
+    return hashlib.sha256(json.dumps([fn_name, list(args)], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_recorded(fn_name, *args):
+    """Returns the recorded response for fn_name(*args)."""
+    path = MOCK_CACHE / f"{_cache_key(fn_name, args)}.json"
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No recorded response for {fn_name}{args!r}; rerun with RECORD_MOCKS=1 to record it."
+        )
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def tools_mod():
+    """The already-imported src.tools module, for patching its attributes directly."""
+    return _tools
+
+
+@pytest.fixture
+def recorded_google(monkeypatch, tools_mod):
+    """
+    Replays recorded create_doc / add_calendar_event responses, keyed by call arguments.
+    With RECORD_MOCKS=1 the real helpers are called and their responses saved instead.
+    Returns load_recorded, so tests can compare against the recorded values.
+    """
+    record = os.getenv("RECORD_MOCKS") == "1"
+    for name in RECORDED_HELPERS:
+        real = getattr(tools_mod, name)
+
+        def replay(*args, _name=name, _real=real):
+            if record:
+                MOCK_CACHE.mkdir(parents=True, exist_ok=True)
+                path = MOCK_CACHE / f"{_cache_key(_name, args)}.json"
+                path.write_text(json.dumps(_real(*args), indent=2) + "\n", encoding="utf-8")
+            return load_recorded(_name, *args)
+
+        monkeypatch.setattr(tools_mod, name, replay)
+    return load_recorded
@@ -0,0 +1,30 @@
+from src.agents import _merge_drafts, feedback_processor_node
+
+
+def test_merge_drafts():
+    left = {"Email": "old email", "Blog Post": "blog"}
+
+    merged = _merge_drafts(left, {"Email": "new email", "LinkedIn Post": "post", "Blog Post": None})
+
+    assert merged == {"Email": "new email", "LinkedIn Post": "post"}
+    # The reducer builds a new dict rather than mutating the existing state
+    assert left == {"Email": "old email", "Blog Post": "blog"}
+    # A None left side (first write) starts from empty; tombstones for missing assets are no-ops
+    assert _merge_drafts(None, {"Email": "draft", "Blog Post": None}) == {"Email": "draft"}
+
+
+def test_feedback_processor_tombstones_revisions():
+    state = {
+        "plan": ["Email", "Blog Post", "LinkedIn Post"],
+        "drafts": {"Email": "e", "Blog Post": "b", "LinkedIn Post": "l"},
+        "draft_status": {"Email": "approved", "LinkedIn Post": "needs_revision", "Blog Post": "needs_revision"},
+        "feedback_iteration": 1,
+    }
+
+    result = feedback_processor_node(state)
+
+    assert result["drafts"] == dict.fromkeys({"Blog Post", "LinkedIn Post"})
+    # Revision restarts at the first revised asset in plan order
+    assert result["current_asset"] == "Blog Post"
+    assert result["feedback_iteration"] == 2
+    assert _merge_drafts(state["drafts"], result["drafts"]) == {"Email": "e"}
@@ -1,47 +1,40 @@
-import unittest
-from unittest.mock import MagicMock, patch
-import os
-import sys
+import re
 
-# Add src to python path
-sys.path.append(os.path.join(os.getcwd()))
+import pytest
 
 from src.tools import GoogleDocTool, GoogleCalendarTool
-from src.agents import create_graph
-
-class TestNewFeatures(unittest.TestCase):
-    def test_google_doc_tool(self):
-        tool = GoogleDocTool()
-        with patch('src.tools.create_doc') as mock_create:
-            mock_create.return_value = ("mock_id", "mock_url")
-            result = tool._run("test title", "test content")
-            self.assertIn("Successfully created document", result)
-            self.assertIn("mock_id", result)
-            self.assertIn("mock_url", result)
-
-    def test_google_calendar_tool(self):
-        tool = GoogleCalendarTool()
-        with patch('src.tools.add_calendar_event') as mock_add:
-            mock_add.return_value = "mock_event_id"
-            result = tool._run("test event", "2023-12-25T09:00:00Z")
-            self.assertIn("Successfully scheduled event", result)
-            self.assertIn("mock_event_id", result)
-
-    def test_graph_structure(self):
-        graph = create_graph()
-        # Verify nodes exist
-        nodes = graph.nodes
-        self.assertIn("publisher", nodes)
-        self.assertIn("router", nodes)
-        self.assertIn("planner", nodes)
-        
-    def test_guardrails_import(self):
-        # Just check if we can import guardrails without error
-        try:
-            import guardrails as gd
-            self.assertTrue(True)
-        except ImportError:
-            self.fail("guardrails-ai not installed")
-
-if __name__ == '__main__':
-    unittest.main()
+
+@pytest.fixture(scope="module")
+def doc_tool():
+    return GoogleDocTool()
+
+@pytest.fixture(scope="module")
+def calendar_tool():
+    return GoogleCalendarTool()
+
+# (tool fixture, recorded helper, tool args, helper args, success message)
+_TOOL_CASES = (
+    ("doc_tool", "create_doc", ("test title", "test content"),
+     ("test title", "test content"), "Successfully created document"),
+    ("calendar_tool", "add_calendar_event", ("test event", "2023-12-25T09:00:00Z"),
+     ("test event", "2023-12-25T09:00:00Z", ""), "Successfully scheduled event"),
+)
+
+@pytest.mark.parametrize("tool_fixture,helper,run_args,helper_args,message", _TOOL_CASES, ids=["doc", "calendar"])
+def test_google_tools(request, recorded_google, tool_fixture, helper, run_args, helper_args, message):
+    tool = request.getfixturevalue(tool_fixture)
+    result = tool._run(*run_args)
+    recorded = recorded_google(helper, *helper_args)
+    values = recorded if isinstance(recorded, list) else [recorded]
+    assert re.search(".*".join([message, *map(re.escape, values)]), result)
+
+def test_redact_competitors():
+    from src.guards import redact_competitors
+    result = redact_competitors("Unlike questrade or Betterment, we beat BETTERMENT.")
+    assert result == "Unlike [REDACTED] or [REDACTED], we beat [REDACTED]."
+    assert redact_competitors("No rivals here.") == "No rivals here."
+
+def test_graph_structure():
+    # Node registry create_graph builds from; no graph construction needed
+    from src.agents import _NODE_NAMES
+    assert {"publisher", "router", "planner"} <= set(_NODE_NAMES)
@@ -0,0 +1,29 @@
+import unittest
+
+from src.rag.cache import SemanticCache
+
+class TestSemanticCache(unittest.TestCase):
+    def test_near_duplicate_query_hits(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.put([1.0, 0.0], "context a")
+        self.assertEqual(cache.get([1.0, 0.1]), "context a")
+        self.assertIsNone(cache.get([1.0, 1.0]))
+
+    def test_evicts_least_recently_used(self):
+        cache = SemanticCache(threshold=0.9, max_entries=2)
+        cache.put([1.0, 0.0], "a")
+        cache.put([0.0, 1.0], "b")
+        cache.get([1.0, 0.0])            # "a" is now more recent than "b"
+        cache.put([-1.0, 0.0], "c")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get([1.0, 0.0]), "a")
+        self.assertIsNone(cache.get([0.0, 1.0]))
+
+    def test_clear(self):
+        cache = SemanticCache()
+        cache.put([1.0, 0.0], "a")
+        cache.clear()
+        self.assertIsNone(cache.get([1.0, 0.0]))
+
+if __name__ == '__main__':
+    unittest.main()